@@ -0,0 +1,170 @@
+import asyncio
+import os
+import sys
+from typing import Iterable, List, Sequence, TextIO
+
+from blackjacj import BlackjackGame, HandStates, NUM_PLAYERS, PromptBettor, PromptStrategy
+from renderer import TERMINAL
+
+
+class StreamOutput:
+    """Text output over an asyncio.StreamWriter, so a table can draw to a socket or pipe."""
+
+    def __init__(self, writer: asyncio.StreamWriter, encoding: str = "utf-8"):
+        self.writer = writer
+        self.encoding = encoding
+
+    def write(self, text: str):
+        self.writer.write(text.encode(self.encoding))
+
+    def flush(self):
+        pass
+
+    async def drain(self):
+        await self.writer.drain()
+
+
+class AsyncPromptStrategy(PromptStrategy):
+    """PromptStrategy with its answers awaited from the game's input stream."""
+
+    async def __call__(self, states: HandStates) -> List[int]:
+        decisions = []
+        for seat in states.seats:
+            decision = None
+            while decision is None:
+                decision = self.decision(seat, await self.game.input(self.prompt(seat)))
+            decisions.append(decision)
+        return decisions
+
+
+class AsyncPromptBettor(PromptBettor):
+    """PromptBettor with its answers awaited from the game's input stream."""
+
+    async def __call__(self, seats: Sequence[int], wallets: Sequence[int], minBet: int,
+                       trueCounts: Sequence[float]) -> List[int]:
+        return self.bets(await self.game.input(self.prompt(seats, minBet)), wallets, minBet)
+
+
+class AsyncBlackjackGame(BlackjackGame):
+    """
+    BlackjackGame driven by an event loop: betting and decision prompts are awaited and
+    answered line by line from an asyncio.StreamReader, so one process can run many
+    tables side by side. Rounds are played exactly as in BlackjackGame, sharing its
+    startHand/applyDecision and applyBets steps. The strategy and bettor plugins are
+    awaited, so the default prompt pair reads its answers from the stream.
+
+    Frames go to output (stdout by default, or a StreamOutput) at a fixed width. Nothing
+    may block the loop, so dealt cards are never held on screen: frames only pace to the
+    scheduler's frame cap, as in fast mode.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, output: TextIO = None, width: int = 80, **kwargs):
+        super().__init__(fastMode=True, **kwargs)
+        self.reader = reader
+        self.output = output if output is not None else sys.stdout
+        self.frame.out = self.output
+        self.terminal = os.terminal_size((width, 24))
+        self.strategy = AsyncPromptStrategy(self)
+        self.bettor = AsyncPromptBettor(self)
+        self.roundsPlayed = 0
+
+    async def playHand(self):
+        """Plays rounds until the input stream ends."""
+        try:
+            while True:
+                await self.playRound()
+        except EOFError:
+            pass
+
+    async def playRound(self):
+        self.drawGame()
+        await self.bettingPhase()
+        self.initialDealPhase()
+
+        active_hands = [i for i in range(NUM_PLAYERS) if self.players[i].hands[0].active_bet > 0]
+        for index in active_hands:
+            await self.playerDecisionPhase(index)
+
+        self.dealerDecisionPhase()
+        self.makePayouts()
+        await self.input("Enter for Next Round")
+
+        self.cleanUpRound()
+        self.roundsPlayed += 1
+
+    async def input(self, prompt: str) -> str:
+        self.input_prompt = prompt
+        self.scheduler.drawn()
+        self.drawGame()
+        self.output.write(prompt)
+        # The answer echoes on the player's terminal, one line under the frame
+        self.frame.linesBelow = 1
+        drain = getattr(self.output, "drain", None)
+        if drain is not None:
+            await drain()
+
+        line = await self.reader.readline()
+        if not line:
+            raise EOFError("Input stream closed")
+        return line.decode().rstrip("\r\n")
+
+    async def bettingPhase(self):
+        index = 0
+        while index < NUM_PLAYERS:
+            seats = range(index, NUM_PLAYERS)
+            index = self.applyBets(seats, await self.bettor(*self.betArguments(seats)))
+
+    async def makeDecision(self, index: int) -> int:
+        return (await self.strategy(self.handStates(index)))[0]
+
+    async def playerDecisionPhase(self, index: int):
+        hand_idx = 0
+        while hand_idx < len(self.players[index].hands):
+            if self.startHand(index, hand_idx):
+                hand_idx = self.applyDecision(index, hand_idx, await self.makeDecision(index))
+            else:
+                hand_idx += 1
+
+
+async def runTables(tables: Iterable[AsyncBlackjackGame]):
+    """Plays every table concurrently on the running loop until each one's input ends."""
+    await asyncio.gather(*(table.playHand() for table in tables))
+
+
+async def stdinReader() -> asyncio.StreamReader:
+    """Standard input as an asyncio stream (POSIX pipes and terminals)."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    return reader
+
+
+def scriptedReader(lines: Iterable[str]) -> asyncio.StreamReader:
+    """A stream that answers prompts with the given lines, then ends."""
+    reader = asyncio.StreamReader()
+    reader.feed_data("".join(line + "\n" for line in lines).encode())
+    reader.feed_eof()
+    return reader
+
+
+if __name__ == "__main__":
+    import io
+    import time
+
+    async def playStdin():
+        await AsyncBlackjackGame(await stdinReader(), width=TERMINAL.columns).playHand()
+
+    async def demo(numTables: int, rounds: int):
+        # Every answer is 'enter': all seats bet the minimum, stand, and move on to the next round
+        script: List[str] = [""] * (7 * rounds)
+        tables = [AsyncBlackjackGame(scriptedReader(script), output=io.StringIO()) for _ in range(numTables)]
+        start = time.perf_counter()
+        await runTables(tables)
+        elapsed = time.perf_counter() - start
+        played = sum(table.roundsPlayed for table in tables)
+        print(f"{numTables} tables, {played:,} rounds in {elapsed:.2f}s ({played / elapsed:,.0f} rounds/s)")
+
+    if "--demo" in sys.argv[1:]:
+        asyncio.run(demo(50, 50))
+    else:
+        asyncio.run(playStdin())
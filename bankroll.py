@@ -0,0 +1,175 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from blackjacj import BlackjackRules, SouthPointRules, STARTING_WALLET, NUM_DECKS, PENETRATION
+from counting import CardCounter, CountSystem, HI_LO
+from montecarlo import chunkSeed
+from simulator import Simulator, SimulationResult, PlayerPolicy, dealerMimicPolicy
+
+# spread(trueCounts) -> bet in units of the minimum bet, one per hand
+BetSpread = Callable[[np.ndarray], np.ndarray]
+
+
+def flatSpread(trueCounts: np.ndarray) -> np.ndarray:
+    return np.ones(len(trueCounts))
+
+
+class RampSpread:
+    """Bets one unit up to a true count of 1, then adds unitsPerCount per true count, up to maxUnits."""
+
+    def __init__(self, maxUnits: float = 8, unitsPerCount: float = 2):
+        self.maxUnits = maxUnits
+        self.unitsPerCount = unitsPerCount
+
+    def __call__(self, trueCounts: np.ndarray) -> np.ndarray:
+        return np.clip(1 + (np.floor(trueCounts) - 1) * self.unitsPerCount, 1, self.maxUnits)
+
+
+def firstSeatBetPolicy(index: int, wallet: int, min_bet: int) -> int:
+    return min_bet if index == 0 else 0
+
+
+class OutcomeModel:
+    """
+    Empirical joint distribution of (true count when the bet goes out, net result of a
+    one-unit bet). Trajectories resample it hand by hand, so counts are treated as
+    independent between hands.
+    """
+
+    def __init__(self, trueCounts: np.ndarray, netUnits: np.ndarray):
+        self.trueCounts = np.asarray(trueCounts, dtype=np.float64)
+        self.netUnits = np.asarray(netUnits, dtype=np.float64)
+
+    @classmethod
+    def fromSimulation(
+        cls,
+        rounds: int,
+        rules: BlackjackRules = SouthPointRules,
+        playerPolicy: PlayerPolicy = dealerMimicPolicy,
+        system: CountSystem = HI_LO,
+        numDecks: int = NUM_DECKS,
+        penetration: float = PENETRATION,
+        seed: int = None
+    ) -> "OutcomeModel":
+        simulator = Simulator(rules=rules, playerPolicy=playerPolicy, betPolicy=firstSeatBetPolicy,
+                              numDecks=numDecks, penetration=penetration, rng=random.Random(seed))
+        counter = CardCounter(system, simulator.deck)
+        trueCounts = np.empty(rounds)
+        netUnits = np.empty(rounds)
+        result = SimulationResult()
+        for i in range(rounds):
+            trueCounts[i] = counter.trueCount()
+            before = result.net_units
+            simulator.playRound(result)
+            netUnits[i] = result.net_units - before
+        return cls(trueCounts, netUnits)
+
+    def __len__(self) -> int:
+        return len(self.netUnits)
+
+
+class BankrollReport:
+    """Per-session results of a bankroll run, with the summaries bankroll sizing needs."""
+
+    def __init__(self, bankroll: float, checkpointHours: List[int], results: np.ndarray, maxDrawdowns: np.ndarray,
+                 ruined: np.ndarray):
+        self.bankroll = bankroll
+        self.checkpointHours = checkpointHours
+        self.results = results  # sessions x checkpoints, net win at each checkpoint hour
+        self.maxDrawdowns = maxDrawdowns
+        self.ruined = ruined
+
+    def riskOfRuin(self) -> float:
+        return float(self.ruined.mean())
+
+    def resultPercentiles(self, percentiles: Sequence[float] = (1, 5, 25, 50, 75, 95, 99)) -> Dict[int, np.ndarray]:
+        return {hours: np.percentile(self.results[:, i], percentiles) for i, hours in enumerate(self.checkpointHours)}
+
+    def drawdownPercentiles(self, percentiles: Sequence[float] = (50, 75, 90, 95, 99)) -> np.ndarray:
+        return np.percentile(self.maxDrawdowns, percentiles)
+
+    def __str__(self):
+        lines = [f"{len(self.ruined):,} sessions, bankroll ${self.bankroll:,.0f}, risk of ruin {self.riskOfRuin():.4%}"]
+        lines.append("hours   " + "".join(f"{p:>10}" for p in ("p1", "p5", "p25", "p50", "p75", "p95", "p99")))
+        for hours, values in self.resultPercentiles().items():
+            lines.append(f"{hours:>5}   " + "".join(f"{value:>10,.0f}" for value in values))
+        lines.append("max drawdown p50/p75/p90/p95/p99: " +
+                     " / ".join(f"{value:,.0f}" for value in self.drawdownPercentiles()))
+        return "\n".join(lines)
+
+
+def runTrajectories(model: OutcomeModel, spread: BetSpread, sessions: int, bankroll: float, minBet: int,
+                    handsPerHour: int, checkpointHours: List[int], seed: int, chunkIndex: int):
+    """Plays one chunk of independent sessions hand by hand, every session in the same array step."""
+    rng = np.random.default_rng(chunkSeed(seed, chunkIndex))
+    wallets = np.full(sessions, float(bankroll))
+    peaks = wallets.copy()
+    maxDrawdowns = np.zeros(sessions)
+    ruined = np.zeros(sessions, dtype=bool)
+    results = np.empty((sessions, len(checkpointHours)))
+
+    checkpoints = {hours * handsPerHour: i for i, hours in enumerate(checkpointHours)}
+    for hand in range(1, max(checkpoints) + 1):
+        samples = rng.integers(0, len(model), size=sessions)
+        bets = np.minimum(spread(model.trueCounts[samples]) * minBet, wallets)
+        bets[ruined] = 0.0
+        wallets += bets * model.netUnits[samples]
+        # A double or split can lose more than the bet; a wallet that can't cover it is lost, and ruined
+        np.maximum(wallets, 0.0, out=wallets)
+        np.maximum(peaks, wallets, out=peaks)
+        np.maximum(maxDrawdowns, peaks - wallets, out=maxDrawdowns)
+        ruined |= wallets < minBet
+        if hand in checkpoints:
+            results[:, checkpoints[hand]] = wallets - bankroll
+    return results, maxDrawdowns, ruined
+
+
+class BankrollSimulator:
+    """
+    Risk-of-ruin study for a bet spread. Wallets are a NumPy array with one entry per
+    session, every hand is one vectorised step, and chunks of sessions run on a process
+    pool with the same per-chunk seeding as runMonteCarlo. A session is ruined once it
+    can no longer cover the minimum bet; bets above the wallet are cut to what is left, and
+    a double or split that loses more than the wallet empties it.
+    """
+
+    def __init__(self, model: OutcomeModel, spread: BetSpread = flatSpread, bankroll: float = STARTING_WALLET,
+                 minBet: int = 20, handsPerHour: int = 100):
+        self.model = model
+        self.spread = spread
+        self.bankroll = bankroll
+        self.minBet = minBet
+        self.handsPerHour = handsPerHour
+
+    def run(self, sessions: int, checkpointHours: Sequence[int] = (1, 10, 100), seed: int = 0, workers: int = None,
+            chunkSessions: int = 50_000) -> BankrollReport:
+        checkpointHours = sorted(checkpointHours)
+        workers = workers or os.cpu_count() or 1
+        sizes = [min(chunkSessions, sessions - start) for start in range(0, sessions, chunkSessions)]
+        arguments = [(self.model, self.spread, size, self.bankroll, self.minBet, self.handsPerHour, checkpointHours,
+                      seed, chunkIndex) for chunkIndex, size in enumerate(sizes)]
+
+        if workers == 1:
+            partials = [runTrajectories(*args) for args in arguments]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                partials = list(pool.map(runTrajectories, *zip(*arguments)))
+
+        return BankrollReport(self.bankroll, checkpointHours,
+                              np.concatenate([partial[0] for partial in partials]),
+                              np.concatenate([partial[1] for partial in partials]),
+                              np.concatenate([partial[2] for partial in partials]))
+
+
+if __name__ == "__main__":
+    from strategy import BasicStrategy
+
+    model = OutcomeModel.fromSimulation(200_000, playerPolicy=BasicStrategy().decide, seed=1)
+    print(f"Outcome model: {len(model):,} hands, EV {model.netUnits.mean():+.4f} units")
+    for name, spread in [("flat", flatSpread), ("1-8 ramp", RampSpread(8, 2))]:
+        print(f"\n{name} spread")
+        print(BankrollSimulator(model, spread, bankroll=STARTING_WALLET * 10).run(100_000, seed=1))
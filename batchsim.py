@@ -0,0 +1,216 @@
+import numpy as np
+from typing import Callable
+
+from blackjacj import BlackjackRules, SouthPointRules, HIT, STAND, DOUBLE
+from settlement import batchKeys, settleBatch
+from simulator import SimulationResult
+from stats import stratumIndex
+
+# Shoes are integer arrays of remaining cards per blackjack value. Index 0 holds aces
+# (value 1, promoted to 11 while the hand stays soft), index 9 holds all ten-valued cards.
+DECK_COMPOSITION = np.array([4, 4, 4, 4, 4, 4, 4, 4, 4, 16], dtype=np.int32)
+
+# Which hand a card is dealt to, for antithetic streams
+PLAYER = 0
+DEALER = 1
+# Most cards one hand can take: every card adds at least 1 and the player stops by 22, the dealer by 17
+MAX_DRAWS = 24
+
+# policy(total, soft, upcard, canDouble) -> array of HIT / STAND / DOUBLE, one per round
+BatchPolicy = Callable[[np.ndarray, np.ndarray, np.ndarray, np.ndarray], np.ndarray]
+
+
+def dealerMimicBatchPolicy(total: np.ndarray, soft: np.ndarray, upcard: np.ndarray, canDouble: np.ndarray) -> np.ndarray:
+    return np.where(total < 17, HIT, STAND)
+
+
+def handTotals(hard: np.ndarray, hasAce: np.ndarray):
+    """
+    Returns (total, soft) for hands summed with every ace counted as 1. One ace is
+    counted as 11 whenever that does not bust the hand, which is the same end state
+    BlackjackHand.append reaches by demoting aces one at a time.
+    """
+    soft = hasAce & (hard + 10 <= 21)
+    return np.where(soft, hard + 10, hard), soft
+
+
+class BatchOutcome:
+    """Per-round outcome arrays for one batch of independent single-seat rounds."""
+
+    def __init__(self, net: np.ndarray, busted: np.ndarray, blackjack: np.ndarray, dealerBusted: np.ndarray,
+                 dealerBlackjack: np.ndarray, doubled: np.ndarray, strata: np.ndarray):
+        self.net = net
+        self.busted = busted
+        self.blackjack = blackjack
+        self.dealerBusted = dealerBusted
+        self.dealerBlackjack = dealerBlackjack
+        self.doubled = doubled
+        self.strata = strata  # stats.stratumIndex of each round's upcard and first two player cards
+
+    def summarize(self, result: SimulationResult = None) -> SimulationResult:
+        result = result if result is not None else SimulationResult()
+        rounds = len(self.net)
+        result.rounds += rounds
+        result.hands += rounds
+        result.wins += int(np.count_nonzero(self.net > 0))
+        result.losses += int(np.count_nonzero(self.net < 0))
+        result.pushes += int(np.count_nonzero(self.net == 0))
+        result.blackjacks += int(np.count_nonzero(self.blackjack))
+        result.busts += int(np.count_nonzero(self.busted))
+        result.samples += rounds
+        result.net_units += float(self.net.sum())
+        result.net_units_squared += float(np.dot(self.net, self.net))
+        return result
+
+
+class AntitheticStreams:
+    """
+    Uniforms for a batch dealt as antithetic pairs: round i and round i + count / 2 use
+    the same two streams of uniforms with the player's and the dealer's swapped, so the
+    second round deals the player roughly the cards the dealer got in the first and vice
+    versa. Their results are strongly negatively correlated, and the mean of a pair is an
+    unbiased sample with much less variance than two independent rounds.
+    """
+
+    def __init__(self, rng: np.random.Generator, count: int):
+        if count % 2:
+            raise ValueError(f"Antithetic batches pair rounds up, so need an even size, not {count}")
+        half = count // 2
+        player = rng.random((MAX_DRAWS, half))
+        dealer = rng.random((MAX_DRAWS, half))
+        self.uniforms = (np.concatenate([player, dealer], axis=1), np.concatenate([dealer, player], axis=1))
+        self.drawn = np.zeros((2, count), dtype=np.int64)
+
+    def take(self, hand: int, rows: np.ndarray) -> np.ndarray:
+        drawn = self.drawn[hand]
+        uniforms = self.uniforms[hand][drawn[rows], rows]
+        drawn[rows] += 1
+        return uniforms
+
+
+class BatchSimulator:
+    """
+    Plays thousands of independent one-seat rounds at once, each from its own freshly
+    shuffled shoe, with the same hit/stand/double, dealer soft 17 and payout rules as
+    BlackjackGame. Splits are not modelled; pairs are played as ordinary totals.
+    """
+
+    def __init__(
+        self,
+        rules: BlackjackRules = SouthPointRules,
+        numDecks: int = 1,
+        policy: BatchPolicy = dealerMimicBatchPolicy,
+        rng: np.random.Generator = None
+    ):
+        self.rules = rules
+        self.numDecks = numDecks
+        self.policy = policy
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def run(self, rounds: int, batchSize: int = 100_000) -> SimulationResult:
+        result = SimulationResult()
+        remaining = rounds
+        while remaining > 0:
+            size = min(batchSize, remaining)
+            self.playBatch(size).summarize(result)
+            remaining -= size
+        return result
+
+    def newShoes(self, count: int) -> np.ndarray:
+        return np.tile(DECK_COMPOSITION * self.numDecks, (count, 1))
+
+    def draw(self, shoes: np.ndarray, rows: np.ndarray, streams: AntitheticStreams = None, hand: int = PLAYER) -> np.ndarray:
+        """Draws one card, uniformly without replacement, from each shoe in rows."""
+        counts = shoes[rows]
+        cumulative = np.cumsum(counts, axis=1)
+        if streams is None:
+            picks = self.rng.integers(0, cumulative[:, -1])
+        else:
+            picks = (streams.take(hand, rows) * cumulative[:, -1]).astype(np.int64)
+        ranks = np.count_nonzero(cumulative <= picks[:, None], axis=1)
+        shoes[rows, ranks] -= 1
+        return ranks + 1
+
+    def playBatch(self, count: int, antithetic: bool = False) -> BatchOutcome:
+        """
+        Plays count rounds. With antithetic, rounds i and i + count / 2 form an antithetic
+        pair (see AntitheticStreams); each round on its own is still an ordinary round.
+        """
+        rules = self.rules
+        shoes = self.newShoes(count)
+        everyRow = np.arange(count)
+        streams = AntitheticStreams(self.rng, count) if antithetic else None
+
+        # Same deal order as initialDealPhase: dealer up, player, dealer hole, player
+        upcard = self.draw(shoes, everyRow, streams, DEALER)
+        first = self.draw(shoes, everyRow, streams, PLAYER)
+        hole = self.draw(shoes, everyRow, streams, DEALER)
+        second = self.draw(shoes, everyRow, streams, PLAYER)
+
+        strata = stratumIndex(upcard, first, second)
+        hard = first + second
+        hasAce = (first == 1) | (second == 1)
+        total, soft = handTotals(hard, hasAce)
+        blackjack = total == 21
+        bet = np.ones(count)
+        doubled = np.zeros(count, dtype=bool)
+
+        # Player decisions. Blackjacks are condensed straight away, as in playerDecisionPhase.
+        active = ~blackjack
+        numCards = 2
+        while active.any():
+            rows = np.flatnonzero(active)
+            canDouble = np.full(len(rows), rules.double_allowed and numCards == 2)
+            actions = self.policy(total[rows], soft[rows], upcard[rows], canDouble)
+            if np.any((actions == DOUBLE) & ~canDouble):
+                raise ValueError("Batch policy chose DOUBLE where doubling is not available")
+
+            drawing = rows[actions != STAND]
+            cards = self.draw(shoes, drawing, streams, PLAYER)
+            hard[drawing] += cards
+            hasAce[drawing] |= cards == 1
+            total[drawing], soft[drawing] = handTotals(hard[drawing], hasAce[drawing])
+
+            doubling = rows[actions == DOUBLE]
+            bet[doubling] = 2.0
+            doubled[doubling] = True
+
+            active[rows[actions != HIT]] = False
+            active &= total <= 21
+            numCards += 1
+
+        busted = total > 21
+
+        # Dealer draws to 17, hitting soft 17 when the rules say so (dealerDecisionPhase)
+        dealerHard = upcard + hole
+        dealerHasAce = (upcard == 1) | (hole == 1)
+        dealerTotal, dealerSoft = handTotals(dealerHard, dealerHasAce)
+        dealerBlackjack = dealerTotal == 21
+        while True:
+            hitting = (dealerTotal < 17) | ((dealerTotal == 17) & dealerSoft & rules.dealer_hits_on_soft_17)
+            rows = np.flatnonzero(hitting)
+            if len(rows) == 0:
+                break
+            cards = self.draw(shoes, rows, streams, DEALER)
+            dealerHard[rows] += cards
+            dealerHasAce[rows] |= cards == 1
+            dealerTotal[rows], dealerSoft[rows] = handTotals(dealerHard[rows], dealerHasAce[rows])
+        dealerBusted = dealerTotal > 21
+
+        # Settlement through the same outcome table as makePayouts, in units of the initial bet
+        dealerKeys = batchKeys(dealerTotal, dealerBusted, dealerBlackjack)
+        _, payouts = settleBatch(dealerKeys, batchKeys(total, busted, blackjack), bet, rules)
+        net = payouts - bet
+
+        return BatchOutcome(net, busted, blackjack, dealerBusted, dealerBlackjack, doubled, strata)
+
+
+if __name__ == "__main__":
+    import time
+
+    rounds = 2_000_000
+    start = time.perf_counter()
+    result = BatchSimulator().run(rounds)
+    elapsed = time.perf_counter() - start
+    print(result)
+    print(f"{rounds / elapsed:,.0f} rounds/s")
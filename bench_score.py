@@ -0,0 +1,76 @@
+import random
+import sys
+import time
+
+from deck import Card, HandTypes, Ranks, Suits, evaluateHand
+
+HAND_SIZES = [5, 6, 7, 8]
+# Multi-deck shoes can put the same card in a hand twice
+DECK_COUNTS = [1, 2]
+
+
+def legacyEvaluate(cards: list) -> tuple:
+    # The pre-evaluateHand Hand.score: try every HandType's findHand, best first
+    for handType in HandTypes:
+        validHand = handType.value.findHand(cards.copy())
+        if validHand:
+            return handType.value, validHand
+
+
+def sameResult(expected: tuple, actual: tuple) -> bool:
+    if expected[0] != actual[0] or len(expected[1]) != len(actual[1]):
+        return False
+    if expected[0] == HandTypes.HIGH_CARD.value:
+        # High card is a fresh copy of the card, so only its code can match
+        return expected[1][0].code == actual[1][0].code
+    return all(a is b for a, b in zip(expected[1], actual[1]))
+
+
+def randomHands(count: int, size: int, numDecks: int, rng: random.Random) -> list:
+    cards = [Card(rank.value, suit.value) for _ in range(numDecks) for rank in Ranks
+             if rank != Ranks.LOW_ACE for suit in Suits]
+    return [rng.sample(cards, size) for _ in range(count)]
+
+
+def timeIt(function, hands: list, minSeconds: float = 0.5) -> float:
+    """
+    Evaluates every hand, over and over for at least minSeconds, and returns hands per
+    second of the fastest pass; the slower passes are the machine's noise, not the code's.
+    """
+    best = 0.0
+    start = time.perf_counter()
+    while True:
+        passStart = time.perf_counter()
+        for hand in hands:
+            function(hand)
+        passEnd = time.perf_counter()
+        best = max(best, len(hands) / (passEnd - passStart))
+        if passEnd - start >= minSeconds:
+            return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    rng = random.Random(1)
+
+    print(f"{'cards':>5} {'decks':>5} {'legacy/s':>12} {'evaluate/s':>12} {'speedup':>8}")
+    for size in HAND_SIZES:
+        for numDecks in DECK_COUNTS:
+            hands = randomHands(count, size, numDecks, rng)
+            for hand in hands:
+                expected, actual = legacyEvaluate(hand), evaluateHand(hand)
+                if not sameResult(expected, actual):
+                    raise AssertionError(f"{[str(card) for card in hand]}: expected {expected[0]} "
+                                         f"{[str(card) for card in expected[1]]}, got {actual[0]} "
+                                         f"{[str(card) for card in actual[1]]}")
+            # Alternated, so a noisy stretch of the machine does not land on just one of them
+            legacy = fast = 0.0
+            for _ in range(5):
+                legacy = max(legacy, timeIt(legacyEvaluate, hands, 0.1))
+                fast = max(fast, timeIt(evaluateHand, hands, 0.1))
+            print(f"{size:>5} {numDecks:>5} {legacy:>12,.0f} {fast:>12,.0f} {fast / legacy:>7.1f}x")
+    print(f"All {count * len(HAND_SIZES) * len(DECK_COUNTS):,} hands scored identically")
+
+
+if __name__ == "__main__":
+    main()
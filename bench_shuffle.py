@@ -0,0 +1,59 @@
+import random
+import time
+
+import numpy as np
+
+from deck import Shoe
+from shuffle import StdlibBackend, NumpyBackend, CounterBackend, shuffleBatch
+
+DECK_COUNTS = [1, 2, 6, 8]
+
+
+def legacyShuffle(cards: list) -> list:
+    # The pre-Fisher-Yates Deck.shuffle: pick a random card, then list.remove it
+    new_deck = []
+    options = list(cards)
+    while len(new_deck) < len(cards):
+        addition = options[random.randrange(0, len(options))]
+        new_deck.append(addition)
+        options.remove(addition)
+    return new_deck
+
+
+def timeIt(function, minSeconds: float = 0.5) -> float:
+    """Calls function repeatedly for at least minSeconds and returns calls per second."""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        function()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= minSeconds:
+            return calls / elapsed
+
+
+def main():
+    backends = {
+        "stdlib": lambda: StdlibBackend(random.Random(1)),
+        "numpy": lambda: NumpyBackend(np.random.default_rng(1)),
+        "counter": lambda: CounterBackend(1),
+    }
+
+    print(f"{'decks':>5} {'engine':>16} {'shoes/s':>12} {'cards/s':>14}")
+    for numDecks in DECK_COUNTS:
+        cards = 52 * numDecks
+        legacyCards = Shoe(numDecks).base_cards
+        rows = [("legacy O(n^2)", timeIt(lambda: legacyShuffle(legacyCards)))]
+        for name, makeBackend in backends.items():
+            shoe = Shoe(numDecks, rng=makeBackend())
+            rows.append((f"shoe/{name}", timeIt(shoe.shuffle)))
+        for name, makeBackend in backends.items():
+            backend = makeBackend()
+            batch = 2_000
+            rows.append((f"batch/{name}", batch * timeIt(lambda: shuffleBatch(batch, numDecks, backend))))
+        for name, rate in rows:
+            print(f"{numDecks:>5} {name:>16} {rate:>12,.0f} {rate * cards:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
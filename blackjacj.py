@@ -1,19 +1,25 @@
-import os
-import time
-from deck import Deck, Card, Suits, Ranks
-from typing import List
+from deck import Shoe, Card, Ranks
+from ledger import Ledger, BANK_WALLET_ID
+from renderer import FrameBuffer, FrameScheduler, MAX_FPS, SPRITES, TERMINAL
+from settlement import BUST_KEY, BLACKJACK_KEY, handKey, payoutTable
+from typing import List, Optional, Sequence
 import sys
 
 NUM_PLAYERS = 5
 STARTING_WALLET = 1200
-BANK_WALLET_ID = -1
 MIN_TIME_STEP = 0.1
+NUM_DECKS = 6
+PENETRATION = 0.75
+TABLE_HEIGHT = 10
 
 HIT = 5001
 STAND = 5002
 SPLIT = 5003
 DOUBLE = 5004
 
+# Typed answers to a decision prompt
+DECISION_KEYS = {"h": HIT, "d": DOUBLE, "s": SPLIT, "": STAND}
+
 split_hand_position_map = {
     2: [-4, 0],
     3: [-6, -3, 1],
@@ -21,12 +27,144 @@ split_hand_position_map = {
 }
 
 
-print("BLACKJACK SIMULATOR")
-
 class BetError(Exception):
     """Custom exception for bet-related errors."""
     pass
 
+
+class HandStates:
+    """
+    A batch of hands waiting on a decision, as strategy plugins see them: one entry per
+    hand in every column. Columns are plain lists, so the terminal game needs no NumPy;
+    batched strategies take them with numpy.asarray. Upcards and pair values count aces
+    as 1, and pair values are 0 for hands that are not a pair. The columns read off the
+    hands and upcards are built when a plugin asks for them, so plugins that only look at
+    the hands don't pay for them.
+    """
+
+    def __init__(self):
+        self.seats: List[int] = []
+        self.hands: List["BlackjackHand"] = []
+        self.upcards: List[Card] = []
+        self.canDouble: List[bool] = []
+        self.canSplit: List[bool] = []
+        self.trueCounts: List[float] = []
+
+    def append(self, seat: int, hand: "BlackjackHand", upcard: Card, canDouble: bool, canSplit: bool,
+               trueCount: float = 0.0):
+        self.seats.append(seat)
+        self.hands.append(hand)
+        self.upcards.append(upcard)
+        self.canDouble.append(canDouble)
+        self.canSplit.append(canSplit)
+        self.trueCounts.append(trueCount)
+
+    @classmethod
+    def single(cls, seat: int, hand: "BlackjackHand", upcard: Card, canDouble: bool, canSplit: bool,
+               trueCount: float = 0.0) -> "HandStates":
+        """A batch of one hand, as the games ask for each decision, built without the appends."""
+        states = cls.__new__(cls)
+        states.seats = [seat]
+        states.hands = [hand]
+        states.upcards = [upcard]
+        states.canDouble = [canDouble]
+        states.canSplit = [canSplit]
+        states.trueCounts = [trueCount]
+        return states
+
+    @property
+    def totals(self) -> List[int]:
+        return [hand.value for hand in self.hands]
+
+    @property
+    def soft(self) -> List[bool]:
+        return [hand.soft_aces > 0 for hand in self.hands]
+
+    @property
+    def pairValues(self) -> List[int]:
+        return [cardValue(hand.cards[0]) if hand.canSplit else 0 for hand in self.hands]
+
+    @property
+    def numCards(self) -> List[int]:
+        return [len(hand.cards) for hand in self.hands]
+
+    @property
+    def upcardValues(self) -> List[int]:
+        return [cardValue(upcard) for upcard in self.upcards]
+
+    def __len__(self):
+        return len(self.seats)
+
+
+def cardValue(card: Card) -> int:
+    value = card.rank.score_value
+    return 1 if value == 11 else value
+
+
+# Plugins. strategy(states) -> one HIT / STAND / DOUBLE / SPLIT per hand in states.
+# bettor(seats, wallets, minBet, trueCounts) -> bets for the first seats asked, in order, 0 to
+# sit out; seats it gives no bet for are asked again. plugins.py has batched implementations.
+
+class PromptStrategy:
+    """The terminal player: each decision is typed at the table's prompt, asking again until it is valid."""
+
+    def __init__(self, game: "BlackjackGame"):
+        self.game = game
+
+    def prompt(self, seat: int) -> str:
+        return f"[HAND {seat + 1}]  enter for stand, H for hit"
+
+    def decision(self, seat: int, answer: str) -> Optional[int]:
+        """The decision typed, or None (with a message) if the answer is not one."""
+        decision = DECISION_KEYS.get(answer.lower())
+        if decision is None:
+            self.game.message(f"[HAND {seat + 1}] Invalid Input - enter for stand, H for hit")
+        return decision
+
+    def __call__(self, states: HandStates) -> List[int]:
+        decisions = []
+        for seat in states.seats:
+            decision = None
+            while decision is None:
+                decision = self.decision(seat, self.game.input(self.prompt(seat)))
+            decisions.append(decision)
+        return decisions
+
+
+class PromptBettor:
+    """
+    Bets typed at the table's prompt, one seat at a time: a number bets that amount,
+    'enter' bets the minimum on this seat and every later one, and '<n>m' sets a new
+    minimum bet before asking again.
+    """
+
+    def __init__(self, game: "BlackjackGame"):
+        self.game = game
+
+    def prompt(self, seats: Sequence[int], minBet: int) -> str:
+        return f"Place bet for hand {seats[0] + 1} ('enter' for min ${minBet} all): $"
+
+    def bets(self, answer: str, wallets: Sequence[int], minBet: int) -> List[int]:
+        """The bets an answer places, from the first seat asked on; none to ask again."""
+        game = self.game
+        if answer == "":
+            # Seats that cannot cover the minimum sit out
+            return [minBet if minBet <= wallet else 0 for wallet in wallets]
+        if answer[-1] == "m":
+            try:
+                game.min_bet = int(answer[:-1])
+            except ValueError:
+                game.message("Invalid minimum bet format. Must be a whole number")
+            return []
+        try:
+            return [int(answer)]
+        except ValueError:
+            game.message("Invalid minimum bet format. Must be a number")
+            return []
+
+    def __call__(self, seats: Sequence[int], wallets: Sequence[int], minBet: int, trueCounts: Sequence[float]) -> List[int]:
+        return self.bets(self.game.input(self.prompt(seats, minBet)), wallets, minBet)
+
 class BlackjackRules:
     def __init__(
         self,
@@ -51,12 +189,20 @@ class BlackjackRules:
 SouthPointRules: BlackjackRules = BlackjackRules()
 
 class Player:
-    def __init__(self, id):
+    def __init__(self, id, ledger: Ledger):
         self.id = id
-        self.wallet = STARTING_WALLET
+        self.ledger = ledger
         self.hands: List[BlackjackHand] = [BlackjackHand(owner_id=id)]  # Initialize with one hand
 
+    @property
+    def wallet(self):
+        # Balances live in the table's ledger
+        return self.ledger.balances[self.id + 1]
+
 class BlackjackHand:
+    # Totals are kept up to date as cards are appended, so every query is O(1)
+    ACE = Ranks.ACE.value
+
     def __init__(self, owner_id):
         self.cards: List[Card] = []
         self.active_bet = 0
@@ -65,6 +211,8 @@ class BlackjackHand:
         self.hasBlackjack = False
         self.canSplit = False
         self.condensed = False  # Fixed typo from 'condesned'
+        self.value = 0
+        self.soft_aces = 0  # Aces still counted as 11
         self.owner_id = owner_id
 
     def reset(self):
@@ -75,60 +223,92 @@ class BlackjackHand:
         self.hasBlackjack = False
         self.canSplit = False
         self.condensed = False
+        self.value = 0
+        self.soft_aces = 0
 
     def append(self, card: Card):
-        self.cards.append(card)
-        if self.doesHaveBlackjack():
-            self.hasBlackjack = True
-        if len(self.cards) == 2 and self.cards[0].rank == self.cards[1].rank:
-            self.canSplit = True
+        cards = self.cards
+        cards.append(card)
+        rank = card.rank
+        value = self.value + rank.score_value
+        if rank is BlackjackHand.ACE:
+            self.soft_aces += 1
+
+        # Only count one high ace as low at a time, as needed
+        while value > 21 and self.soft_aces > 0:
+            value -= 10
+            self.soft_aces -= 1
+        self.value = value
+
+        # Two cards can't bust, so only later cards are checked
+        if len(cards) == 2:
+            if value == 21:
+                self.hasBlackjack = True
+            self.canSplit = cards[0].rank is rank
         else:
             self.canSplit = False
-
-        # Only convert one high ace to low at a time, as needed
-        while self.getValue() > 21 and any(c.rank.name == "A" and c.rank.score_value == 11 for c in self.cards):
-            for i, c in enumerate(self.cards):
-                if c.rank.name == "A" and c.rank.score_value == 11:
-                    # Replace with a new Card object with LOW_ACE rank
-                    self.cards[i] = Card(Ranks.LOW_ACE.value, c.suit)
-                    break  # Only convert one ace per loop
-
-        if self.getValue() > 21:
-            self.busted = True
+            if value > 21:
+                self.busted = True
 
     def doesHaveBlackjack(self) -> bool:
-        if len(self.cards) == 2:
-            ranks = [card.rank for card in self.cards]
-            return (Ranks.ACE.value in ranks and (Ranks.TEN.value in ranks or Ranks.JACK.value in ranks or Ranks.QUEEN.value in ranks or Ranks.KING.value in ranks))
+        return len(self.cards) == 2 and self.value == 21
 
     def getValue(self) -> int:
-        value = 0
-        for card in self.cards:
-            value += card.rank.score_value
-        return value
+        return self.value
+
+    def isSoft(self) -> bool:
+        return self.soft_aces > 0
 
     def __str__(self):
         return f"Hand: {self.cards}, Value: {self.getValue()}, Active Bet: {self.active_bet}, Bust: {self.busted}, Blackjack: {self.hasBlackjack}"
 
 class BlackjackGame:
 
-    def __init__(self):
-        self.deck = Deck()
+    def __init__(
+        self,
+        numDecks: int = NUM_DECKS,
+        penetration: float = PENETRATION,
+        startingWallet: int = STARTING_WALLET,
+        dealerWallet: int = STARTING_WALLET * 100,
+        ledger: Ledger = None,
+        fastMode: bool = False,
+        maxFps: float = MAX_FPS,
+        rng=None,
+        shoes=None
+    ):
+        # The ledger holds whole chips, so 1000.0 is taken as 1000 but 999.5 is refused
+        for name, amount in (("startingWallet", startingWallet), ("dealerWallet", dealerWallet)):
+            if amount != int(amount):
+                raise ValueError(f"{name} must be a whole number of chips, not {amount}")
+        startingWallet, dealerWallet = int(startingWallet), int(dealerWallet)
+
+        # rng and shoes are the Shoe's shuffle backend and shoe source (see deck.Shoe)
+        self.deck = Shoe(numDecks=numDecks, penetration=penetration, rng=rng, source=shoes)
         self.deck.shuffle()
         self.dealer_hand: BlackjackHand = BlackjackHand(owner_id=0)
-        self.dealer_wallet = STARTING_WALLET * 100  # Dealer has separate wallet
-        self.players: List[Player] = [Player(i) for i in range(NUM_PLAYERS)]
+        self.ledger = ledger if ledger is not None else Ledger(NUM_PLAYERS)
+        self.ledger.deposit(dealerWallet, BANK_WALLET_ID)  # Dealer has separate wallet
+        self.players: List[Player] = [Player(i, self.ledger) for i in range(NUM_PLAYERS)]
+        for player in self.players:
+            self.ledger.deposit(startingWallet, player.id)
         self.rules = SouthPointRules
+        self.history = None  # Optional recorder told about every deal, decision and settlement (history.py)
+        self.counter = None  # Optional CardCounter, whose true count plugins are shown
+        # Decisions and bets come from plugins; by default they are typed at the terminal
+        self.strategy = PromptStrategy(self)
+        self.bettor = PromptBettor(self)
 
         self.min_bet = 20
 
         self.marker_index = -1
         self.active_hand_idx = 0
         self.blackjack_markers = [False for _ in range(NUM_PLAYERS)]
-        self.isDrawn = False
+        self.frame = FrameBuffer(0, TABLE_HEIGHT)
+        self.terminal = TERMINAL  # Anything with a columns attribute
+        # Fast mode never holds a frame: for bots, demos and soak tests
+        self.scheduler = FrameScheduler(self.drawGame, stepDelay=0 if fastMode else MIN_TIME_STEP, maxFps=maxFps)
 
         self.input_prompt = ""
-        self.prev_input = False
         self.message_content = ""
 
     def playHand(self):
@@ -150,208 +330,196 @@ class BlackjackGame:
 
             self.cleanUpRound()
 
+    @property
+    def dealer_wallet(self):
+        return self.ledger.balances[0]
+
     def makePayment(self, amount: int, from_wallet_id: int, to_wallet_id: int):
         """
-        Centralized payment system.
+        Centralized payment system, journaled by the table's ledger.
         wallet_id: -1 for dealer, 0-4 for players
         """
-        if from_wallet_id == BANK_WALLET_ID:  # From dealer
-            if self.dealer_wallet >= amount:
-                self.dealer_wallet -= amount
-                if to_wallet_id >= 0:  # To player
-                    self.players[to_wallet_id].wallet += amount
-            else:
-                raise ValueError(f"Dealer insufficient funds: {self.dealer_wallet} < {amount}")
-        elif to_wallet_id == BANK_WALLET_ID:  # To dealer
-            if from_wallet_id >= 0:  # From player
-                if self.players[from_wallet_id].wallet >= amount:
-                    self.players[from_wallet_id].wallet -= amount
-                    self.dealer_wallet += amount
-                else:
-                    raise ValueError(f"Player {from_wallet_id} insufficient funds: {self.players[from_wallet_id].wallet} < {amount}")
-        elif from_wallet_id >= 0 and to_wallet_id >= 0:  # Player to player
-            if self.players[from_wallet_id].wallet >= amount:
-                self.players[from_wallet_id].wallet -= amount
-                self.players[to_wallet_id].wallet += amount
-            else:
-                raise ValueError(f"Player {from_wallet_id} insufficient funds: {self.players[from_wallet_id].wallet} < {amount}")
-        else:
-            raise ValueError(f"Invalid wallet IDs: from={from_wallet_id}, to={to_wallet_id}")
+        self.ledger.transfer(amount, from_wallet_id, to_wallet_id)
 
     def makePayouts(self):
-        if self.dealer_hand.hasBlackjack:
-            for i in range(NUM_PLAYERS):
-                for hand in self.players[i].hands:
-                    if hand.hasBlackjack:
-                        hand.payoutDisplay = int(hand.active_bet)
-                        self.makePayment(hand.active_bet, BANK_WALLET_ID, i)
-                    # Losing bets already taken during betting phase
-        elif self.dealer_hand.busted:
-            for i in range(NUM_PLAYERS):
-                for hand in self.players[i].hands:
-                    if hand.busted:
-                        # Losing bets already taken during betting phase
-                        pass
-                    elif hand.hasBlackjack:
-                        payout = int(hand.active_bet * self.rules.blackjack_payout)
-                        hand.payoutDisplay = payout
-                        self.makePayment(payout, BANK_WALLET_ID, i)
-                    else:
-                        payout = int(hand.active_bet * 2)
-                        hand.payoutDisplay = payout
-                        self.makePayment(payout, BANK_WALLET_ID, i)
-        else:
-            for i in range(NUM_PLAYERS):
-                for hand in self.players[i].hands:
-                    if hand.busted:
-                        # Losing bets already taken during betting phase
-                        pass
-                    elif hand.hasBlackjack:
-                        payout = int(hand.active_bet * self.rules.blackjack_payout)
+        # Losing bets were already taken during the betting phase, so only returns are paid
+        payouts = payoutTable(self.rules.blackjack_payout)[handKey(self.dealer_hand)]
+        amounts = []
+        payees = []
+        for i, player in enumerate(self.players):
+            for hand in player.hands:
+                if hand.active_bet:
+                    key = BUST_KEY if hand.busted else BLACKJACK_KEY if hand.hasBlackjack else hand.value
+                    payout = int(hand.active_bet * payouts[key])
+                    if payout:
                         hand.payoutDisplay = payout
-                        self.makePayment(payout, BANK_WALLET_ID, i)
-                    elif hand.getValue() > self.dealer_hand.getValue():
-                        payout = int(hand.active_bet * 2)
-                        hand.payoutDisplay = payout
-                        self.makePayment(payout, BANK_WALLET_ID, i)
-                    elif hand.getValue() == self.dealer_hand.getValue():
-                        # Push - return bet
-                        hand.payoutDisplay = int(hand.active_bet)
-                        self.makePayment(hand.active_bet, BANK_WALLET_ID, i)
-                    # Losing bets already taken during betting phase
+                        amounts.append(payout)
+                        payees.append(i)
+        if amounts:
+            self.ledger.payMany(amounts, BANK_WALLET_ID, payees)
+        if self.history is not None:
+            self.history.endRound(self)
 
     def dealerDecisionPhase(self):
-        self.dealer_hand.cards[1].flipped = False
-        self.drawGame()
-        while self.dealer_hand.getValue() < 17 or (self.dealer_hand.getValue() == 17 and self.rules.dealer_hits_on_soft_17 and ([card.rank for card in self.dealer_hand.cards].count(Ranks.ACE.value) > 0)):
+        self.deck.reveal(self.dealer_hand.cards[1])
+        self.scheduler.request()
+        while self.dealer_hand.getValue() < 17 or (self.dealer_hand.getValue() == 17 and self.rules.dealer_hits_on_soft_17 and self.dealer_hand.isSoft()):
             self.dealer_hand.append(self.deck.draw(flipped=False))
-            self.drawGame()
-            time.sleep(MIN_TIME_STEP)
+            self.animate()
 
     def playerDecisionPhase(self, index: int):
         hand_idx = 0
         while hand_idx < len(self.players[index].hands):
-            hand = self.players[index].hands[hand_idx]
-            self.setActionMarker(index)
-            self.active_hand_idx = hand_idx
+            if self.startHand(index, hand_idx):
+                hand_idx = self.applyDecision(index, hand_idx, self.makeDecision(index))
+            else:
+                hand_idx += 1
 
-            if hand.hasBlackjack:
-                # Condense the hand immediately
+    def startHand(self, index: int, hand_idx: int) -> bool:
+        # Points the marker at the hand; False when it needs no decision
+        hand = self.players[index].hands[hand_idx]
+        self.setActionMarker(index)
+        self.active_hand_idx = hand_idx
+
+        if hand.hasBlackjack:
+            # Condense the hand immediately
+            hand.condensed = True
+            return False
+        return True
+
+    def applyDecision(self, index: int, hand_idx: int, playerDecision: int) -> int:
+        # Plays one decision on the active hand and returns the index of the hand to play next
+        hand = self.players[index].hands[hand_idx]
+        if self.history is not None:
+            self.history.action(index, playerDecision)
+
+        if playerDecision == HIT:
+            hand.append(self.deck.draw())
+            if hand.busted:
+                # Condense the hand when busted
                 hand.condensed = True
                 hand_idx += 1
-                continue
-
-            playerDecision = self.makeDecision(index)
-
-            if playerDecision == HIT:
-                hand.append(self.deck.draw())
-                if hand.busted:
-                    # Condense the hand when busted
+            # Otherwise stay on same hand for further decisions
+
+        elif playerDecision == STAND:
+            # Condense the hand when standing
+            hand.condensed = True
+            hand_idx += 1
+
+        elif playerDecision == DOUBLE:
+            if not self.rules.double_allowed:
+                self.message(f"[HAND {index + 1}] Double not allowed.")
+            elif len(hand.cards) == 2:
+                if hand.active_bet <= self.players[index].wallet:
+                    # Take additional bet from player wallet
+                    self.makePayment(hand.active_bet, index, BANK_WALLET_ID)
+                    hand.active_bet *= 2
+                    hand.append(self.deck.draw())
+                    self.animate()
+                    self.message(f"[HAND {index + 1}] Doubled bet to ${hand.active_bet}.")
+                    # Condense the hand after doubling
                     hand.condensed = True
                     hand_idx += 1
-                    continue
-                # Stay on same hand for further decisions
-
-            elif playerDecision == STAND:
-                # Condense the hand when standing
-                hand.condensed = True
-                hand_idx += 1
-
-            elif playerDecision == DOUBLE:
-                if not self.rules.double_allowed:
-                    self.message(f"[HAND {index + 1}] Double not allowed.")
-                    continue
-                elif len(hand.cards) == 2:
-                    if hand.active_bet <= self.players[index].wallet:
-                        # Take additional bet from player wallet
-                        self.makePayment(hand.active_bet, index, BANK_WALLET_ID)
-                        hand.active_bet *= 2
-                        hand.append(self.deck.draw())
-                        self.drawGame()
-                        time.sleep(MIN_TIME_STEP)
-                        self.message(f"[HAND {index + 1}] Doubled bet to ${hand.active_bet}.")
-                        # Condense the hand after doubling
-                        hand.condensed = True
-                        hand_idx += 1
-                    else:
-                        self.message(f"[HAND {index + 1}] Ineligible for double.")
                 else:
                     self.message(f"[HAND {index + 1}] Ineligible for double.")
-
-            elif playerDecision == SPLIT:
-                if not self.rules.split_allowed:
-                    self.message(f"[HAND {index + 1}] Split not allowed.")
-                    continue
-                elif len(self.players[index].hands) >= self.rules.max_splits + 1:
-                    self.message(f"[HAND {index + 1}] Maximum splits reached.")
-                    continue
-                elif hand.canSplit:
-                    split_bet = hand.active_bet
-                    if self.players[index].wallet >= split_bet:
-                        # Take bet for second hand
-                        self.makePayment(split_bet, index, BANK_WALLET_ID)
-
-                        card1, card2 = hand.cards
-                        new_hand1 = BlackjackHand(owner_id=self.players[index].id)
-                        new_hand2 = BlackjackHand(owner_id=self.players[index].id)
-                        new_hand1.append(Card(Ranks.ACE.value if card1.rank == Ranks.LOW_ACE.value else card1.rank, card1.suit))
-                        new_hand2.append(Card(Ranks.ACE.value if card2.rank == Ranks.LOW_ACE.value else card2.rank, card2.suit))
-                        new_hand1.active_bet = split_bet
-                        new_hand2.active_bet = split_bet
-
-                        # Remove the original hand and insert the new hands at its position
-                        self.players[index].hands.pop(hand_idx)
-                        self.players[index].hands.insert(hand_idx, new_hand2)
-                        self.players[index].hands.insert(hand_idx, new_hand1)
-                        # Do not increment hand_idx, so the next iteration will process the first new split hand
-                    else:
-                        self.message(f"[HAND {index + 1}] Not enough funds to split.")
-                        continue
+            else:
+                self.message(f"[HAND {index + 1}] Ineligible for double.")
+
+        elif playerDecision == SPLIT:
+            if not self.rules.split_allowed:
+                self.message(f"[HAND {index + 1}] Split not allowed.")
+            elif len(self.players[index].hands) >= self.rules.max_splits + 1:
+                self.message(f"[HAND {index + 1}] Maximum splits reached.")
+            elif hand.canSplit:
+                split_bet = hand.active_bet
+                if self.players[index].wallet >= split_bet:
+                    # Take bet for second hand
+                    self.makePayment(split_bet, index, BANK_WALLET_ID)
+
+                    card1, card2 = hand.cards
+                    new_hand1 = BlackjackHand(owner_id=self.players[index].id)
+                    new_hand2 = BlackjackHand(owner_id=self.players[index].id)
+                    new_hand1.append(card1)
+                    new_hand2.append(card2)
+                    new_hand1.active_bet = split_bet
+                    new_hand2.active_bet = split_bet
+
+                    # Remove the original hand and insert the new hands at its position
+                    self.players[index].hands.pop(hand_idx)
+                    self.players[index].hands.insert(hand_idx, new_hand2)
+                    self.players[index].hands.insert(hand_idx, new_hand1)
+                    # Do not increment hand_idx, so the next decision is for the first new split hand
                 else:
-                    self.message(f"[HAND {index + 1}] Ineligible for split.")
-                    # Still condense invalid split attempts
-                    hand.condensed = True
-                    hand_idx += 1
+                    self.message(f"[HAND {index + 1}] Not enough funds to split.")
+            else:
+                self.message(f"[HAND {index + 1}] Ineligible for split.")
+                # Still condense invalid split attempts
+                hand.condensed = True
+                hand_idx += 1
+
+        return hand_idx
 
     def setBlackjackMarker(self, index: int):
         self.blackjack_markers[index] = True
 
-    def makeDecision(self, index: int) -> bool:
-        decisionInput = self.input(f"[HAND {index + 1}]  enter for stand, H for hit").lower()
-
-        if decisionInput == "h":
-            return HIT
-        elif decisionInput == "d":
-            return DOUBLE
-        elif decisionInput == "s":
-            return SPLIT
-        elif decisionInput == "":
-             return STAND
-        else:
-            # invalid input, try again
-            self.message(f"[HAND {index + 1}] Invalid Input - enter for stand, H for hit")
-            return self.makeDecision(index)
+    def decisionOptions(self, index: int):
+        """(canDouble, canSplit) for the seat's active hand under the table rules and the seat's wallet."""
+        player = self.players[index]
+        hand = player.hands[self.active_hand_idx]
+        canDouble = (self.rules.double_allowed and len(hand.cards) == 2 and hand.active_bet <= player.wallet
+                     and (len(player.hands) == 1 or self.rules.double_after_split))
+        canSplit = (self.rules.split_allowed and hand.canSplit and len(player.hands) < self.rules.max_splits + 1
+                    and hand.active_bet <= player.wallet)
+        return canDouble, canSplit
+
+    def trueCount(self) -> float:
+        return self.counter.trueCount() if self.counter is not None else 0.0
+
+    def handStates(self, index: int, states: HandStates = None) -> HandStates:
+        """Adds the seat's active hand to states (a new batch by default)."""
+        canDouble, canSplit = self.decisionOptions(index)
+        hand = self.players[index].hands[self.active_hand_idx]
+        if states is None:
+            return HandStates.single(index, hand, self.dealer_hand.cards[0], canDouble, canSplit, self.trueCount())
+        states.append(index, hand, self.dealer_hand.cards[0], canDouble, canSplit, self.trueCount())
+        return states
+
+    def makeDecision(self, index: int) -> int:
+        return self.strategy(self.handStates(index))[0]
+
+    def betArguments(self, seats: Sequence[int]) -> tuple:
+        """The bettor's arguments for seats."""
+        return seats, [self.players[i].wallet for i in seats], self.min_bet, [self.trueCount()] * len(seats)
+
+    def applyBets(self, seats: Sequence[int], bets: Sequence[int]) -> int:
+        """Places a bettor's bets on seats in order and returns the seat to ask next; a rejected bet is asked again."""
+        for seat, bet in zip(seats, bets):
+            try:
+                self.requestBet(seat, bet)
+            except BetError as e:
+                self.message(str(e))
+                return seat
+        return seats[0] + min(len(seats), len(bets))
 
     def bettingPhase(self):
-        for i in range(NUM_PLAYERS):
-            end = self.individualBetPhase(i)
-            if end:
-                break
+        index = 0
+        while index < NUM_PLAYERS:
+            seats = range(index, NUM_PLAYERS)
+            index = self.applyBets(seats, self.bettor(*self.betArguments(seats)))
 
     def initialDealPhase(self):
+        if self.history is not None:
+            self.history.startRound(self.deck.position)
         self.dealer_hand.append(self.deck.draw())
-        self.drawGame()
-        time.sleep(MIN_TIME_STEP)
+        self.animate()
 
         for i in range(NUM_PLAYERS):
             if self.players[i].hands[0].active_bet > 0:
                 self.players[i].hands[0].append(self.deck.draw())
-                self.drawGame()
-                time.sleep(MIN_TIME_STEP)
+                self.animate()
 
         self.dealer_hand.append(self.deck.draw(flipped=True))
-        self.drawGame()
-        time.sleep(MIN_TIME_STEP)
+        self.animate()
 
         for i in range(NUM_PLAYERS):
             if self.players[i].hands[0].active_bet > 0:
@@ -359,41 +527,7 @@ class BlackjackGame:
                 if self.players[i].hands[0].hasBlackjack:
                     # self.payoutBlackjack(i)
                     self.setBlackjackMarker(i)
-                self.drawGame()
-                time.sleep(MIN_TIME_STEP)
-
-    def individualBetPhase(self, index):
-        unproccessed_input = self.input(f"Place bet for hand {index + 1} ('enter' for min ${self.min_bet} all): $")
-
-        # bet all min
-        if unproccessed_input == "":
-            self.minBetAll(index)
-            return True
-
-        # set new min
-        if unproccessed_input[-1] == "m":
-            try:
-                self.min_bet = int(unproccessed_input[:-1])
-                for j in range(NUM_PLAYERS):
-                    self.players[j].hands[0].active_bet = self.min_bet
-            except ValueError:
-                self.message("Invalid minimum bet format. Must be a whole number")
-                self.individualBetPhase(index)  # retry if not valid
-            except BetError as e:
-                self.message(str(e))
-                self.individualBetPhase(index)  # retry if not valid
-
-        # place individual bet
-        else:
-            try:
-                bet = int(unproccessed_input)
-                self.requestBet(index, bet)
-            except ValueError:
-                self.message("Invalid minimum bet format. Must be a number")
-                self.individualBetPhase(index)  # retry if not valid
-            except BetError as e:
-                self.message(str(e))
-                self.individualBetPhase(index)  # retry if not valid
+                self.animate()
 
     def setActionMarker(self, index: int):
         self.marker_index = index
@@ -418,8 +552,14 @@ class BlackjackGame:
             self.makePayment(bet, index, BANK_WALLET_ID)
         self.players[index].hands[0].active_bet = bet
 
+    def animate(self):
+        # Show the change (coalesced with others under the frame cap) and hold it long enough to be seen
+        self.scheduler.step()
+
     def input(self, prompt: str) -> str:
         self.input_prompt = prompt
+        # The prompt frame shows every pending change
+        self.scheduler.drawn()
         return self.drawGame(input_request=prompt)
 
     def message(self, content: str):
@@ -454,37 +594,21 @@ class BlackjackGame:
             # Format: " ${123} "
             return f"{"$"+num_str}".center(7)
 
-    def clear_last_n_lines(self, n=3):
-            for _ in range(n):
-                # Move cursor up one line
-                sys.stdout.write('\x1b[1A')
-                # Clear the line
-                sys.stdout.write('\x1b[2K')
-            sys.stdout.flush()
-
     def drawGame(self, input_request="") -> str | None:
-        terminal_width = os.get_terminal_size().columns
-        terminal_height = 10
-
-        if(self.isDrawn):
-            self.clear_last_n_lines(terminal_height + (1 if self.prev_input else 0) + 1)
-            self.prev_input = False
-            self.prev_message = False
-        else:
-            self.isDrawn = True
-
-        self.symbols = [" " for _ in range(terminal_width * terminal_height)]
+        terminal_width = self.terminal.columns
+        terminal_height = TABLE_HEIGHT
+
+        # Compose into the reused frame buffer; present() repaints only the lines that changed
+        frame = self.frame
+        frame.resize(terminal_width)
+        frame.clear()
+        self.symbols = frame.cells
         center_x = terminal_width // 2
 
         # Draw dealer cards
         for index, card in enumerate(self.dealer_hand.cards):
             x_pos = center_x - 3 + (index * 3)
-            reserve = card.ascii_art_coords()
-            for item in reserve:
-                x = item['x'] + x_pos - 2
-                y = item['y']
-                if 0 <= x < terminal_width and 0 <= y < terminal_height:
-                    self.symbols[x + (y * terminal_width)] = item['symbol']
+            frame.blit(x_pos - 2, 0, SPRITES.card(card))
 
         spacing = terminal_width // (NUM_PLAYERS + 1)
         # Track marker position for split hands
@@ -496,12 +620,7 @@ class BlackjackGame:
                 hand = player.hands[0]
                 for index, card in enumerate(hand.cards):
                     x_pos = center_x + (player_index - NUM_PLAYERS // 2) * spacing + (index * 3)
-                    reserve = card.ascii_art_coords()
-                    for item in reserve:
-                        x = item['x'] + x_pos - 2
-                        y = item['y'] + 4
-                        if 0 <= x < terminal_width and 0 <= y < terminal_height:
-                            self.symbols[x + (y * terminal_width)] = item['symbol']
+                    frame.blit(x_pos - 2, 4, SPRITES.card(card))
                 # Marker for single hand
                 if self.marker_index == player_index:
                     marker_x = center_x + (player_index - NUM_PLAYERS // 2) * spacing
@@ -521,26 +640,13 @@ class BlackjackGame:
                     hand_x_positions.append(x_pos)
 
                     if hand.condensed:  # Fixed typo
-                        reserve = Card(Ranks.ACE.value, Suits.DIAMONDS.value, handValue=hand.getValue()).ascii_art_coords()
-                        for item in reserve:
-                            x = item['x'] + x_pos - 2
-                            y = item['y'] + 4
-                            if 0 <= x < terminal_width and 0 <= y < terminal_height:
-                                self.symbols[x + (y * terminal_width)] = item['symbol']
+                        frame.blit(x_pos - 2, 4, SPRITES.handTotal(hand.getValue()))
                         if hand.hasBlackjack:
-                            bj_x = x_pos
-                            start = bj_x + (3 * terminal_width)
-                            end = start + 3
-                            self.symbols[start:end] = "✯★✯"
+                            frame.blit(x_pos, 3, ("✯★✯",))
                     else:
                         for card_index, card in enumerate(hand.cards):
                             card_x_pos = x_pos + (card_index * 3)
-                            reserve = card.ascii_art_coords()
-                            for item in reserve:
-                                x = item['x'] + card_x_pos - 2
-                                y = item['y'] + 4
-                                if 0 <= x < terminal_width and 0 <= y < terminal_height:
-                                    self.symbols[x + (y * terminal_width)] = item['symbol']
+                            frame.blit(card_x_pos - 2, 4, SPRITES.card(card))
 
                 # Marker for split hands
                 if self.marker_index == player_index:
@@ -550,10 +656,7 @@ class BlackjackGame:
                 # Blackjack markers for split hands
                 for hand_index, hand in enumerate(player.hands):
                     if hand.hasBlackjack and not hand.condensed:  # Only show stars if not condensed
-                        bj_x = hand_x_positions[hand_index]
-                        start = bj_x + (3 * terminal_width)
-                        end = start + 3
-                        self.symbols[start:end] = "✯★✯"
+                        frame.blit(hand_x_positions[hand_index], 3, ("✯★✯",))
 
         # Draw marker
         if marker_x is not None and marker_y is not None:
@@ -571,9 +674,7 @@ class BlackjackGame:
             else:
                 bet_str = self.formatMoneyString(total_bet) if total_payout == 0 else self.formatMoneyString(total_payout, isPayout=True)
 
-            for j, char in enumerate(bet_str):
-                if 0 <= bet_x + j < terminal_width:
-                    self.symbols[bet_x + j + (bet_y * terminal_width)] = char
+            frame.blit(bet_x, bet_y, (bet_str,))
 
         # fill wallets
         for i in range(NUM_PLAYERS):
@@ -583,9 +684,7 @@ class BlackjackGame:
             # Clear payout displays after showing
             for hand in self.players[i].hands:
                 hand.payoutDisplay = 0
-            for j, char in enumerate(wallet_str):
-                if 0 <= wallet_x + j < terminal_width:
-                    self.symbols[wallet_x + j + (wallet_y * terminal_width)] = char
+            frame.blit(wallet_x, wallet_y, (wallet_str,))
 
         # draw border
         padding = terminal_width // 10
@@ -597,17 +696,13 @@ class BlackjackGame:
         self.symbols[9*terminal_width + terminal_width - padding] = "│"
 
         # draw
-        for y in range(terminal_height):
-            for x in range(terminal_width):
-                print(self.symbols[x+(y*terminal_width)], end="")
-            print("")
-
-        print(self.message_content)
+        self.frame.present([self.message_content])
         self.message_content = ""
 
         # input
         if input_request != "":
-            self.prev_input = True
+            # The prompt and the typed answer leave one line under the frame
+            self.frame.linesBelow = 1
             return input(self.input_prompt)
 
     def cleanUpRound(self):
@@ -618,10 +713,12 @@ class BlackjackGame:
         self.marker_index = -1
         self.blackjack_markers = [False for _ in range(NUM_PLAYERS)]
         self.message_content = ""
-        self.deck = Deck()
-        self.deck.shuffle()
+        self.deck.endRound()
+        if self.deck.cutCardReached():
+            self.deck.shuffle()
 
 
 if __name__ == "__main__":
-    game = BlackjackGame()
+    print("BLACKJACK SIMULATOR")
+    game = BlackjackGame(fastMode="--fast" in sys.argv[1:])
     game.playHand()
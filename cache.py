@@ -0,0 +1,43 @@
+from collections import OrderedDict
+
+
+class BoundedCache:
+    """
+    Least-recently-used memo with a fixed number of entries. Once full, storing a new
+    entry evicts the one that has gone unused the longest.
+    """
+
+    def __init__(self, maxSize: int = 1_000_000):
+        if maxSize < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.maxSize = maxSize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        entries = self.entries
+        if key in entries:
+            entries.move_to_end(key)
+            self.hits += 1
+            return entries[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        entries = self.entries
+        entries[key] = value
+        entries.move_to_end(key)
+        if len(entries) > self.maxSize:
+            entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self.entries
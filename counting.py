@@ -0,0 +1,109 @@
+from typing import Dict, List, Sequence
+
+from deck import Card, Ranks, Deck, Shoe
+
+# Blackjack value of every rank, aces as 1, used to index tag tables and compositions
+RANK_VALUES: Dict[object, int] = {rank.value: 1 if rank.value.score_value == 11 else rank.value.score_value for rank in Ranks}
+
+
+class CountSystem:
+    """
+    A card-counting system: one tag per blackjack value (index 0 for aces, 9 for all
+    ten-valued cards). Unbalanced systems start the running count at
+    initialOffset + initialPerDeck * decks, e.g. 4 - 4 * decks for KO.
+    """
+
+    def __init__(self, name: str, tags: Sequence[float], initialPerDeck: float = 0, initialOffset: float = 0):
+        if len(tags) != 10:
+            raise ValueError("A count system needs one tag for each value from ace to ten")
+        self.name = name
+        self.tags = list(tags)
+        self.initialPerDeck = initialPerDeck
+        self.initialOffset = initialOffset
+
+    def isBalanced(self) -> bool:
+        return sum(self.tags[:9]) + 4 * self.tags[9] == 0
+
+    def initialCount(self, numDecks: float) -> float:
+        return self.initialOffset + self.initialPerDeck * numDecks
+
+    def __str__(self):
+        return self.name
+
+
+#                    A   2   3   4   5   6   7   8   9   T
+HI_LO = CountSystem("Hi-Lo", [-1, 1, 1, 1, 1, 1, 0, 0, 0, -1])
+KO = CountSystem("KO", [-1, 1, 1, 1, 1, 1, 1, 0, 0, -1], initialPerDeck=-4, initialOffset=4)
+OMEGA_II = CountSystem("Omega II", [0, 1, 1, 2, 2, 2, 1, 0, -1, -2])
+
+
+class CardCounter:
+    """
+    Keeps a running count, true count and composition of unseen cards for one Deck or
+    Shoe. It listens to the deck, so every draw costs one tag lookup and two additions,
+    and every query is a read. Cards dealt face down are not counted until the deck
+    reveals them.
+    """
+
+    def __init__(self, system: CountSystem = HI_LO, deck: Deck | Shoe = None):
+        self.system = system
+        self.tagsByRank = {rank: system.tags[value - 1] for rank, value in RANK_VALUES.items()}
+        self.fullComposition: List[int] = [0] * 10
+        self.totalCards = 0
+        self.reset()
+        if deck is not None:
+            self.attach(deck)
+
+    def attach(self, deck: Deck | Shoe):
+        self.fullComposition = [0] * 10
+        for card in deck.base_cards:
+            self.fullComposition[RANK_VALUES[card.rank] - 1] += 1
+        self.totalCards = len(deck.base_cards)
+        deck.listeners.append(self)
+        self.reset()
+        if isinstance(deck, Shoe):
+            for index in deck.order[:deck.position]:
+                self.cardDrawn(deck.base_cards[index])
+
+    def reset(self):
+        self.running_count = self.system.initialCount(self.totalCards / 52)
+        self.composition = list(self.fullComposition)
+        self.unseen = self.totalCards
+
+    # Deck listener hooks
+
+    def shuffled(self):
+        self.reset()
+
+    def cardDrawn(self, card: Card):
+        if not card.flipped:
+            self.count(card)
+
+    def cardRevealed(self, card: Card):
+        self.count(card)
+
+    def count(self, card: Card):
+        rank = card.rank
+        self.running_count += self.tagsByRank[rank]
+        self.composition[RANK_VALUES[rank] - 1] -= 1
+        self.unseen -= 1
+
+    # Queries
+
+    def runningCount(self) -> float:
+        return self.running_count
+
+    def decksRemaining(self) -> float:
+        return self.unseen / 52
+
+    def trueCount(self) -> float:
+        decks = self.unseen / 52
+        return self.running_count / decks if decks > 0 else 0.0
+
+    def remainingComposition(self) -> tuple:
+        """Unseen cards by blackjack value (aces first), in the form DealerProbabilities takes."""
+        return tuple(self.composition)
+
+    def __str__(self):
+        return (f"{self.system} running count {self.running_count:+g}, true count {self.trueCount():+.2f}, "
+                f"{self.unseen} cards unseen")
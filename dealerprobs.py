@@ -0,0 +1,161 @@
+from collections import Counter
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from blackjacj import BlackjackRules, SouthPointRules
+from cache import BoundedCache
+from deck import Shoe
+from strategy import DEALER_OUTCOMES, DEALER_BUST, DEALER_BLACKJACK, softTotal
+
+# Compositions are tuples of remaining card counts by blackjack value: index 0 holds
+# aces, index 9 every ten-valued card.
+Composition = Tuple[int, ...]
+
+
+def shoeComposition(shoe: Shoe) -> Composition:
+    counts = [0] * 10
+    for index in shoe.order[shoe.position:]:
+        value = shoe.base_cards[index].rank.score_value
+        counts[0 if value == 11 else value - 1] += 1
+    return tuple(counts)
+
+
+def removeCard(composition: Composition, value: int) -> Composition:
+    i = value - 1
+    return composition[:i] + (composition[i] - 1,) + composition[i + 1:]
+
+
+class DealerDrawTable:
+    """
+    Every set of cards the dealer can draw to a finished hand from one upcard, with how
+    many valid draw orders each set has. Each order of the same set is equally likely
+    without replacement, so the chance of an outcome for any shoe composition is a sum
+    of falling-factorial products over this table, evaluated for all sets at once.
+    """
+
+    def __init__(self, upcard: int, dealerHitsOnSoft17: bool):
+        orderings = Counter()
+
+        def collect(hard: int, hasAce: bool, drawn: List[int]):
+            total, soft = softTotal(hard, hasAce)
+            if len(drawn) == 1 and total == 21:
+                outcome = DEALER_BLACKJACK
+            elif total > 21:
+                outcome = DEALER_BUST
+            elif total > 17 or (total == 17 and not (soft and dealerHitsOnSoft17)):
+                outcome = total - 17
+            else:
+                for value in range(1, 11):
+                    drawn.append(value)
+                    collect(hard + value, hasAce or value == 1, drawn)
+                    drawn.pop()
+                return
+            counts = [0] * 10
+            for value in drawn:
+                counts[value - 1] += 1
+            orderings[(tuple(counts), outcome)] += 1
+
+        collect(upcard, upcard == 1, [])
+        # Only the non-zero multiplicities of each set matter, stored flat with one run per set
+        sets = list(orderings)
+        self.outcomes = np.array([outcome for _, outcome in sets], dtype=np.intp)
+        self.orderings = np.array(list(orderings.values()), dtype=np.float64)
+        self.numDrawn = np.array([sum(counts) for counts, _ in sets], dtype=np.intp)
+        self.entryValues = np.array([v for counts, _ in sets for v in range(10) if counts[v]], dtype=np.intp)
+        self.entryCounts = np.array([counts[v] for counts, _ in sets for v in range(10) if counts[v]], dtype=np.intp)
+        self.setStarts = np.cumsum([0] + [sum(1 for c in counts if c) for counts, _ in sets[:-1]])
+        self.maxDrawn = int(self.numDrawn.max())
+        self.steps = np.arange(self.maxDrawn, dtype=np.float64)
+
+    def finalTotals(self, composition: Composition) -> List[float]:
+        counts = np.array(composition, dtype=np.float64)
+        # fallingFactorials[v, m] = counts[v] * (counts[v] - 1) * ... over m terms
+        fallingFactorials = np.empty((10, self.maxDrawn + 1))
+        fallingFactorials[:, 0] = 1.0
+        np.cumprod(np.maximum(counts[:, None] - self.steps, 0.0), axis=1, out=fallingFactorials[:, 1:])
+        shoeFactorials = np.empty(self.maxDrawn + 1)
+        shoeFactorials[0] = 1.0
+        np.cumprod(np.maximum(counts.sum() - self.steps, 0.0), out=shoeFactorials[1:])
+
+        chances = np.multiply.reduceat(fallingFactorials[self.entryValues, self.entryCounts], self.setStarts)
+        chances *= self.orderings
+        drawOrders = shoeFactorials[self.numDrawn]
+        # Sets needing more cards than the shoe holds have no draw orders at all
+        np.divide(chances, drawOrders, out=chances, where=drawOrders > 0)
+        return np.bincount(self.outcomes, weights=chances, minlength=DEALER_OUTCOMES).tolist()
+
+
+class DealerProbabilities:
+    """
+    Exact distribution of the dealer's final total, drawing without replacement from a
+    known shoe composition under the dealerDecisionPhase rules. Results are returned in
+    the DEALER_OUTCOMES slots: totals 17-21, bust, then two-card blackjack.
+
+    Results are memoised on (composition, hand state) in a bounded LRU cache, so queries
+    later in the same shoe mostly reuse earlier work. Whole dealer hands from an upcard go
+    through a precomputed DealerDrawTable; partialTotals walks any other hand state.
+    """
+
+    def __init__(self, rules: BlackjackRules = SouthPointRules, cacheSize: int = 1_000_000):
+        self.rules = rules
+        self.cache = BoundedCache(cacheSize)
+        self.tables = [None] + [DealerDrawTable(upcard, rules.dealer_hits_on_soft_17) for upcard in range(1, 11)]
+
+    def finalTotals(self, upcard: int, composition: Sequence[int]) -> List[float]:
+        """
+        upcard is the dealer's blackjack value (ace = 1); composition is what is left
+        in the shoe with the upcard already removed, including the unseen hole card.
+        """
+        composition = tuple(composition)
+        key = (composition, upcard)
+        outcome = self.cache.get(key)
+        if outcome is None:
+            outcome = self.tables[upcard].finalTotals(composition)
+            self.cache.put(key, outcome)
+        return outcome
+
+    def partialTotals(self, composition: Sequence[int], hard: int, hasAce: bool, numCards: int) -> List[float]:
+        """Same distribution for a dealer hand already holding numCards cards summing to hard (aces as 1)."""
+        return self.walk(tuple(composition), hard, hasAce, numCards)
+
+    def walk(self, composition: Composition, hard: int, hasAce: bool, numCards: int) -> List[float]:
+        key = (composition, hard, hasAce, min(numCards, 3))
+        outcome = self.cache.get(key)
+        if outcome is not None:
+            return outcome
+
+        total, soft = softTotal(hard, hasAce)
+        outcome = [0.0] * DEALER_OUTCOMES
+        if numCards == 2 and total == 21:
+            outcome[DEALER_BLACKJACK] = 1.0
+        elif total > 21:
+            outcome[DEALER_BUST] = 1.0
+        elif total > 17 or (total == 17 and not (soft and self.rules.dealer_hits_on_soft_17)):
+            outcome[total - 17] = 1.0
+        else:
+            remaining = sum(composition)
+            for value in range(1, 11):
+                count = composition[value - 1]
+                if count == 0:
+                    continue
+                chance = count / remaining
+                following = self.walk(removeCard(composition, value), hard + value, hasAce or value == 1, numCards + 1)
+                for i in range(DEALER_OUTCOMES):
+                    outcome[i] += chance * following[i]
+
+        self.cache.put(key, outcome)
+        return outcome
+
+
+if __name__ == "__main__":
+    import time
+
+    calculator = DealerProbabilities()
+    sixDecks = (24, 24, 24, 24, 24, 24, 24, 24, 24, 96)
+    print(f"{'up':>3} " + " ".join(f"{name:>7}" for name in ["17", "18", "19", "20", "21", "bust", "bj"]))
+    start = time.perf_counter()
+    for up in range(1, 11):
+        distribution = calculator.finalTotals(up, removeCard(sixDecks, up))
+        print(f"{'A' if up == 1 else up:>3} " + " ".join(f"{chance:7.4f}" for chance in distribution))
+    print(f"{time.perf_counter() - start:.3f}s, {len(calculator.cache)} cached states")
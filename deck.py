@@ -1,18 +1,28 @@
-import math
-import random
+from array import array
 from enum import Enum
-from typing import List, Callable
+from operator import attrgetter
+from typing import List, Callable, Tuple
 
+from shuffle import asBackend, fisherYates
 
-# Represents a Suit.
+
+# Represents a Suit. Suits are interned: constructing the same suit twice returns the same
+# object, so equality and hashing are plain identity checks.
 class Suit:
-    def __init__(self, name: str):
-        self.name = name
+    __slots__ = ('name', 'index')
+    _interned = {}
 
-    def __eq__(self, other):
-        if isinstance(other, Suit):
-            return self.name == other.name
-        return False
+    def __new__(cls, name: str):
+        suit = cls._interned.get(name)
+        if suit is None:
+            suit = super().__new__(cls)
+            suit.name = name
+            suit.index = len(cls._interned)
+            cls._interned[name] = suit
+        return suit
+
+    def __getnewargs__(self):
+        return (self.name,)
 
 
 # Enumerated Type Representing the four possible suits that a card may have.
@@ -23,17 +33,25 @@ class Suits(Enum):
     SPADES = Suit('♠')
 
 
-# Represents a Rank with a name and a value
+# Represents a Rank with a name and a value. Interned the same way as Suit.
 class Rank:
-    def __init__(self, name: str, priority: int, score_value: int):
-        self.name = name
-        self.priority = priority
-        self.score_value = score_value
-
-    def __eq__(self, other):
-        if isinstance(other, Rank):
-            return self.name == other.name and self.priority == other.priority and self.score_value == other.score_value
-        return False
+    __slots__ = ('name', 'priority', 'score_value', 'index')
+    _interned = {}
+
+    def __new__(cls, name: str, priority: int, score_value: int):
+        key = (name, priority, score_value)
+        rank = cls._interned.get(key)
+        if rank is None:
+            rank = super().__new__(cls)
+            rank.name = name
+            rank.priority = priority
+            rank.score_value = score_value
+            rank.index = len(cls._interned)
+            cls._interned[key] = rank
+        return rank
+
+    def __getnewargs__(self):
+        return (self.name, self.priority, self.score_value)
 
     def __str__(self):
         return f"{self.name}"
@@ -59,28 +77,34 @@ class Ranks(Enum):
 
     LOW_ACE = Rank('a', 14, 1)
 
+RANKS_BY_NAME = {r.value.name: r.value for r in Ranks}
+SUITS_BY_NAME = {s.value.name: s.value for s in Suits}
+
 class Card:
-    static_id = 0
+    # code packs rank and suit into one small int, which is all equality and hashing look at
+    __slots__ = ('rank', 'suit', 'code', 'id', 'flipped', 'handValue')
+    # The next card's id, in a list: counting on the class itself would change the class with
+    # every new card, which throws away the interpreter's cached attribute lookups on cards
+    static_id = [0]
 
     def __init__(self, rank: Rank, suit: Suit, handValue=0):
         self.rank = rank
         self.suit = suit
-        self.id = Card.static_id
+        self.code = rank.index * 4 + suit.index
+        self.id = Card.static_id[0]
         self.flipped = False
         self.handValue = handValue
-        Card.static_id += 1
+        Card.static_id[0] += 1
 
     @classmethod
     def from_string(cls, card_str: str):
         # Example input: "8♣", "J♠", "A♥"
-        rank_map = {r.value.name: r.value for r in Ranks}
-        suit_map = {s.value.name: s.value for s in Suits}
         if len(card_str) < 2:
             raise ValueError("Invalid card string format")
         rank_part = card_str[:-1]
         suit_part = card_str[-1]
-        rank = rank_map.get(rank_part)
-        suit = suit_map.get(suit_part)
+        rank = RANKS_BY_NAME.get(rank_part)
+        suit = SUITS_BY_NAME.get(suit_part)
         if not rank or not suit:
             raise ValueError(f"Invalid card string: {card_str}")
         return cls(rank, suit)
@@ -92,21 +116,21 @@ class Card:
 
     @classmethod
     def from_card(cls, other_card):
-        new = Card(Ranks.EIGHT.value, Suits.DIAMONDS.value)
-        new.rank = other_card.rank
-        new.suit = other_card.suit
-        return new
+        return cls(other_card.rank, other_card.suit)
 
     def __str__(self):
         return self.rank.name + " of " + self.suit.name # + " which scores for " + str(self.getScoringValue()) + " points"
 
     def __eq__(self, other):
         if isinstance(other, Card):
-            return self.rank == other.rank and self.suit == other.suit
+            return self.code == other.code
         return False
 
+    def __hash__(self):
+        return self.code
+
     def __copy__(self):
-        newCard = Card(self.rank, self.suit)
+        return Card(self.rank, self.suit, self.handValue)
 
     def getScoringValue(self) -> int:
         return self.scoringValue
@@ -114,43 +138,53 @@ class Card:
     def flip(self):
         self.flipped = not self.flipped
 
+    def ascii_art(self) -> Tuple[str, str, str]:
+        return cardArt(self.rank, self.suit, self.flipped, self.handValue)
+
     def ascii_art_coords(self) -> List[dict]:
         """
         Returns a list of dicts: {'symbol': str, 'x': int, 'y': int}
         representing the card as a 4x3 box with value and suit centered,
         using Unicode box-drawing characters.
         """
-        # Unicode box-drawing characters
-        TL = '┌'  # top-left
-        TR = '┐'  # top-right
-        BL = '└'  # bottom-left
-        BR = '┘'  # bottom-right
-        H  = '─'  # horizontal
-        V  = '│'  # vertical
-
-        if self.handValue > 0:
-            valueString = f"{int(self.handValue):02d}" if self.handValue <= 21 else "XX"
-            value = valueString[0]
-            suit = valueString[1]
-        else:
-            value = self.rank.name if not self.flipped else "▓"
-            suit = self.suit.name if not self.flipped else "▓"
-
-        lines = [
-            [TL, H, H, TR],
-            [V, value, suit, V],
-            [BL, H, H, BR]
-        ]
-
         coords = []
-        for y, line in enumerate(lines):
+        for y, line in enumerate(self.ascii_art()):
             for x, symbol in enumerate(line):
                 coords.append({'symbol': symbol, 'x': x, 'y': y})
         return coords
 
 
+def cardArt(rank: Rank, suit: Suit, flipped: bool = False, handValue: int = 0) -> Tuple[str, str, str]:
+    """
+    The three lines of a card drawn as a 4x3 box. A positive handValue shows that total
+    instead of rank and suit (a condensed hand), and a flipped card shows its back.
+    """
+    # Unicode box-drawing characters
+    TL = '┌'  # top-left
+    TR = '┐'  # top-right
+    BL = '└'  # bottom-left
+    BR = '┘'  # bottom-right
+    H  = '─'  # horizontal
+    V  = '│'  # vertical
+
+    if handValue > 0:
+        valueString = f"{int(handValue):02d}" if handValue <= 21 else "XX"
+        value = valueString[0]
+        suit = valueString[1]
+    else:
+        value = rank.name if not flipped else "▓"
+        suit = suit.name if not flipped else "▓"
+
+    return TL + H + H + TR, V + value + suit + V, BL + H + H + BR
+
+
 class Deck:
-    def __init__(self, ):
+    def __init__(self, rng=None):
+        # Shuffles draw from rng (random.Random, numpy Generator or a shuffle backend)
+        # when given, otherwise from the global random module
+        self.rng = asBackend(rng)
+        # Notified of every draw, reveal and shuffle (see counting.CardCounter)
+        self.listeners = []
         self.base_cards: List[Card] = []
         for suit in Suits:
             for rank in Ranks:
@@ -174,23 +208,26 @@ class Deck:
         self.base_cards.pop(target_index)
 
     def shuffle(self):
-        # shuffle deck here
-        new_deck = []
-        options = list(self.base_cards)
-        while len(new_deck) < len(self.base_cards):
-            index = math.floor(random.randrange(0, len(options)))
-            addition = options[index]
-            new_deck.append(addition)
-            options.remove(addition)
-
-        self.active_cards = new_deck
+        self.active_cards = fisherYates(list(self.base_cards), self.rng)
+        for listener in self.listeners:
+            listener.shuffled()
 
     def draw(self, flipped=False) -> Card:
         card = self.active_cards.pop()
         if flipped:
             card.flip()
+        for listener in self.listeners:
+            listener.cardDrawn(card)
         return card
 
+    def reveal(self, card: Card):
+        card.flipped = False
+        for listener in self.listeners:
+            listener.cardRevealed(card)
+
+    def __len__(self) -> int:
+        return len(self.base_cards)
+
     def __str__(self) -> str:
         returnString = "Printing out deck:\n"
         for card in self.base_cards:
@@ -204,7 +241,7 @@ class Deck:
 
         returnString += "\n\n"
         returnString += "Deck ID: " + str(id(self)) + "\n"
-        returnString += "Static ID: " + str(Card.static_id) + "\n"
+        returnString += "Static ID: " + str(Card.static_id[0]) + "\n"
 
         return returnString
 
@@ -221,6 +258,93 @@ class Deck:
             raise StopIteration
 
 
+class Shoe:
+    """
+    A multi-deck shoe with a cut card. Cards are built once; shuffling permutes a compact
+    array of indices into them and drawing just advances a position, so neither allocates
+    per card. The shoe only needs a reshuffle once the cut card has come out.
+
+    With a source (see replay.py), shuffles stop using rng: the n-th shuffle takes its
+    order from source.order(n, number of cards), so runs can replay the same shoes.
+    """
+
+    def __init__(self, numDecks: int = 6, penetration: float = 0.75, rng=None, source=None):
+        if not 1 <= numDecks <= 8:
+            raise ValueError(f"A shoe holds 1 to 8 decks, not {numDecks}")
+        if not 0 < penetration <= 1:
+            raise ValueError(f"Penetration must be in (0, 1], not {penetration}")
+
+        self.rng = asBackend(rng)
+        self.listeners = []
+        self.numDecks = numDecks
+        self.penetration = penetration
+        self.base_cards: List[Card] = []
+        for _ in range(numDecks):
+            self.base_cards.extend(Deck().base_cards)
+
+        self.order = array('H', range(len(self.base_cards)))
+        self.position = 0
+        self.cut_index = int(len(self.base_cards) * penetration)
+        self.source = source
+        self.shoe_index = -1  # Shuffles so far, less one: the index of the shoe being dealt
+        self.round_start = 0  # Where the round being dealt began; earlier cards are discards
+
+    def shuffle(self):
+        self.shoe_index += 1
+        if self.source is not None:
+            self.order = array('H', self.source.order(self.shoe_index, len(self.base_cards)))
+        else:
+            fisherYates(self.order, self.rng)
+        self.position = 0
+        self.round_start = 0
+        for listener in self.listeners:
+            listener.shuffled()
+
+    def endRound(self):
+        self.round_start = self.position
+
+    def reshuffleDiscards(self):
+        """
+        Shuffles mid-round, leaving the cards on the table out: they are moved to the front
+        of the new order, as already dealt, and the discards are dealt after them.
+        """
+        inPlay = self.order[self.round_start:self.position]
+        if len(inPlay) == len(self.order):
+            raise ValueError("Every card in the shoe is on the table")
+        self.shuffle()
+        held = set(inPlay)
+        self.order = inPlay + array('H', [index for index in self.order if index not in held])
+        self.position = len(inPlay)
+        for listener in self.listeners:
+            for index in inPlay:
+                listener.cardDrawn(self.base_cards[index])
+
+    def draw(self, flipped=False) -> Card:
+        if self.position == len(self.order):
+            # Ran past the end mid-round; deal on from the discards rather than fail
+            self.reshuffleDiscards()
+        card = self.base_cards[self.order[self.position]]
+        self.position += 1
+        card.flipped = flipped
+        for listener in self.listeners:
+            listener.cardDrawn(card)
+        return card
+
+    def reveal(self, card: Card):
+        card.flipped = False
+        for listener in self.listeners:
+            listener.cardRevealed(card)
+
+    def cutCardReached(self) -> bool:
+        return self.position >= self.cut_index
+
+    def remaining(self) -> int:
+        return len(self.order) - self.position
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+
 class Hand:
     def __init__(self, cards=None, handSize=8):
         self.handSize = handSize
@@ -257,15 +381,12 @@ class Hand:
         self.cards.remove(card)
         return None
 
+    def evaluate(self) -> Tuple["HandType", List[Card]]:
+        """The best hand type held and the cards that score it (see evaluateHand)."""
+        return evaluateHand(self.cards)
+
     def score(self):
-        scoringHandType: HandType = None
-        scoringHand: List[Card] = None
-        for handType in HandTypes:
-            validHand: List[Card] = handType.value.findHand(self.cards.copy())
-            if validHand:
-                scoringHandType = handType.value
-                scoringHand = validHand
-                break
+        scoringHandType, scoringHand = evaluateHand(self.cards)
 
         chips = scoringHandType.chips
         mult = scoringHandType.mult
@@ -515,3 +636,108 @@ class HandTypes(Enum):
     TWO_PAIR = HandType(20, 2, findTwoPair, "Two Pair")
     PAIR = HandType(10, 2, findPair, "Pair")
     HIGH_CARD = HandType(5, 1, findHighCard, "High Card")
+
+
+# evaluateHand's histogram: by Card.code, a one in the byte for the card's suit and in the
+# byte 4 + its priority. Summed over a hand, the sum's bytes count every suit and priority.
+COUNTS_BY_CODE = [0] * (4 * len(Rank._interned))
+for _rank in Ranks:
+    for _suit in Suits:
+        COUNTS_BY_CODE[_rank.value.index * 4 + _suit.value.index] = (1 << 8 * _suit.value.index
+                                                                    | 1 << 8 * (4 + _rank.value.priority))
+# The sum starts at 123 in every suit byte, which sets a byte's top bit exactly when the
+# suit's count is 5 or more
+FLUSH_START = 0x7B7B7B7B
+FLUSH_BITS = 0x80808080
+# Maps a count byte to 1 if any card has that priority
+PRESENT = bytes([0] + [1] * 255)
+cardPriority = attrgetter("rank.priority")
+RUN = b"\x01" * 5
+
+(STRAIGHT_FLUSH, FOUR_OF_A_KIND, FULL_HOUSE, FLUSH, STRAIGHT,
+ THREE_OF_A_KIND, TWO_PAIR, PAIR, HIGH_CARD) = (handType.value for handType in HandTypes)
+
+
+def rankShape(ranks: int) -> tuple:
+    """
+    The best hand type a rank histogram makes short of flushes, with the priorities it is
+    read from: (type, priority, second priority or 0). A straight gives its lowest rank.
+    """
+    counts = ranks.to_bytes(15, "little")
+    # Sets count at their exact size only, the highest first
+    quad = counts.rfind(4)
+    if quad >= 0:
+        return FOUR_OF_A_KIND, quad, 0
+    trips = counts.rfind(3)
+    pair = counts.rfind(2)
+    if trips >= 0 and pair >= 0:
+        return FULL_HOUSE, trips, pair
+
+    present = counts.translate(PRESENT)
+    top = present.rfind(RUN)
+    if top >= 0:
+        # The highest run of five, walked down to the bottom of the run it is part of
+        return STRAIGHT, present.rfind(0, 0, top) + 1, 0
+
+    if trips >= 0:
+        return THREE_OF_A_KIND, trips, 0
+    if pair >= 0:
+        low = counts.find(2)
+        if low != pair:
+            return TWO_PAIR, low, counts.find(2, low + 1)
+        return PAIR, pair, 0
+    return HIGH_CARD, len(present.rstrip(b"\x00")) - 1, 0
+
+
+# Rank histogram -> rankShape, filled in as hands are evaluated. Hands of up to eight
+# cards have a few tens of thousands of histograms between them.
+RANK_SHAPES = {}
+
+
+def evaluateHand(cards: List[Card]) -> Tuple[HandType, List[Card]]:
+    """
+    The best HandType in cards and its scoring cards, exactly as walking HandTypes with
+    each findHand would give them, quirks included: sets count only at their exact size,
+    two pair is the two lowest pairs, a straight is the lowest five of the highest run
+    and a straight flush must be the top five cards of its suit. The rank and suit
+    histograms are summed once; flushes are a bitmask test on the suit bytes and the rest
+    is looked up by the rank bytes.
+    """
+    histogram = sum([COUNTS_BY_CODE[card.code] for card in cards], FLUSH_START)
+    ranks = histogram >> 32
+    shape = RANK_SHAPES.get(ranks)
+    if shape is None:
+        shape = RANK_SHAPES[ranks] = rankShape(ranks)
+    handType, priority, second = shape
+
+    flushBits = histogram & FLUSH_BITS
+    if flushBits:
+        # Flush candidates in Suits order, each cut to its five highest cards (ties in hand order)
+        flushes = []
+        for index in range(4):
+            if flushBits >> 8 * index & 0x80:
+                top = sorted([card for card in cards if card.suit.index == index], key=cardPriority, reverse=True)[:5]
+                flushes.append(top)
+        straightFlush = None
+        for top in flushes:
+            if top[0].rank.priority - top[4].rank.priority == 4 and len({card.rank.priority for card in top}) == 5:
+                if straightFlush is None or top[0].rank.priority > straightFlush[0].rank.priority:
+                    straightFlush = top
+        if straightFlush is not None:
+            return STRAIGHT_FLUSH, straightFlush[::-1]
+        if handType is not FOUR_OF_A_KIND and handType is not FULL_HOUSE:
+            return FLUSH, flushes[0]
+
+    if handType is PAIR or handType is THREE_OF_A_KIND or handType is FOUR_OF_A_KIND:
+        return handType, [card for card in cards if card.rank.priority == priority]
+    if handType is HIGH_CARD:
+        for card in cards:
+            if card.rank.priority == priority:
+                return HIGH_CARD, [Card.from_card(card)]
+        return HIGH_CARD, [None]
+    if handType is STRAIGHT:
+        # Walked backwards, so the card kept for each rank is its first in hand order
+        first = {card.rank.priority: card for card in reversed(cards)}
+        return STRAIGHT, [first[rank] for rank in range(priority, priority + 5)]
+    return handType, ([card for card in cards if card.rank.priority == priority]
+                      + [card for card in cards if card.rank.priority == second])
@@ -0,0 +1,176 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from blackjacj import BlackjackRules, SouthPointRules, HIT, STAND, SPLIT, DOUBLE
+from cache import BoundedCache
+from dealerprobs import Composition, DealerProbabilities, removeCard
+from strategy import DEALER_BUST, DEALER_BLACKJACK, softTotal
+
+
+class ActionValues:
+    """EV of each player action in units of the initial bet; None where the action is unavailable."""
+
+    def __init__(self, stand: float, hit: Optional[float] = None, double: Optional[float] = None,
+                 split: Optional[float] = None):
+        self.stand = stand
+        self.hit = hit
+        self.double = double
+        self.split = split
+
+    def best(self) -> Tuple[int, float]:
+        choices = [(STAND, self.stand), (HIT, self.hit), (DOUBLE, self.double), (SPLIT, self.split)]
+        return max(((action, value) for action, value in choices if value is not None), key=lambda choice: choice[1])
+
+    def __str__(self):
+        def show(value):
+            return "    -   " if value is None else f"{value:+.4f}"
+        return f"stand {show(self.stand)}  hit {show(self.hit)}  double {show(self.double)}  split {show(self.split)}"
+
+
+class ExpectedValueEngine:
+    """
+    Exact composition-dependent EVs for stand, hit and double, drawing without
+    replacement from the remaining shoe and settling like makePayouts: no dealer peek,
+    dealer blackjack takes doubled and split bets, naturals pay blackjack_payout with the
+    bet included. Hits and doubles are exact. Splits follow the usual approximation of
+    playing each split hand against the same post-split composition, with two-card 21s
+    paid as blackjacks and resplits budgeted per hand up to max_splits.
+
+    Player states and dealer distributions are memoised on (composition, hand state) in
+    bounded LRU caches, so repeated queries against the same shoe are cheap.
+    """
+
+    def __init__(self, rules: BlackjackRules = SouthPointRules, cacheSize: int = 1_000_000):
+        self.rules = rules
+        self.dealer = DealerProbabilities(rules, cacheSize)
+        self.cache = BoundedCache(cacheSize)
+
+    def evaluate(self, playerCards: Sequence[int], upcard: int, composition: Sequence[int],
+                 canDouble: bool = True, canSplit: bool = True) -> ActionValues:
+        """
+        playerCards and upcard are blackjack values (ace = 1); composition is what is left in
+        the shoe once they have been dealt, hole card included.
+        """
+        composition = tuple(composition)
+        hard = sum(playerCards)
+        hasAce = 1 in playerCards
+        total = softTotal(hard, hasAce)[0]
+        if len(playerCards) == 2 and total == 21:
+            return ActionValues(self.blackjackEV(composition, upcard))
+
+        values = ActionValues(self.standEV(composition, upcard, total), self.hitEV(composition, upcard, hard, hasAce))
+        if canDouble and self.rules.double_allowed and len(playerCards) == 2:
+            values.double = self.doubleEV(composition, upcard, hard, hasAce)
+        if (canSplit and self.rules.split_allowed and self.rules.max_splits > 0 and len(playerCards) == 2
+                and playerCards[0] == playerCards[1]):
+            values.split = 2 * self.splitHandEV(composition, upcard, playerCards[0], self.rules.max_splits - 1)
+        return values
+
+    def evaluateAll(self, composition: Sequence[int]) -> Dict[Tuple[int, int, int], ActionValues]:
+        """
+        Every starting situation from a shoe composition taken before the deal: the 55
+        two-card player hands against the 10 upcards, keyed (low card, high card, upcard).
+        """
+        composition = tuple(composition)
+        results = {}
+        for upcard in range(1, 11):
+            if composition[upcard - 1] == 0:
+                continue
+            afterUpcard = removeCard(composition, upcard)
+            for first in range(1, 11):
+                for second in range(first, 11):
+                    remaining = removeCard(afterUpcard, first)
+                    if min(remaining) < 0 or remaining[second - 1] == 0:
+                        continue
+                    remaining = removeCard(remaining, second)
+                    results[(first, second, upcard)] = self.evaluate((first, second), upcard, remaining)
+        return results
+
+    def dealerOutcomes(self, composition: Composition, upcard: int) -> List[float]:
+        return self.dealer.finalTotals(upcard, composition)
+
+    def standEV(self, composition: Composition, upcard: int, total: int) -> float:
+        if total > 21:
+            return -1.0
+        dealer = self.dealerOutcomes(composition, upcard)
+        ev = dealer[DEALER_BUST] - dealer[DEALER_BLACKJACK]
+        for dealerTotal in range(17, 22):
+            chance = dealer[dealerTotal - 17]
+            if total > dealerTotal:
+                ev += chance
+            elif total < dealerTotal:
+                ev -= chance
+        return ev
+
+    def blackjackEV(self, composition: Composition, upcard: int) -> float:
+        dealerBlackjack = self.dealerOutcomes(composition, upcard)[DEALER_BLACKJACK]
+        return (1 - dealerBlackjack) * (self.rules.blackjack_payout - 1)
+
+    def draws(self, composition: Composition):
+        """(value, chance, composition after drawing it) for every card still in the shoe."""
+        remaining = sum(composition)
+        for value in range(1, 11):
+            count = composition[value - 1]
+            if count:
+                yield value, count / remaining, removeCard(composition, value)
+
+    def bestEV(self, composition: Composition, upcard: int, hard: int, hasAce: bool) -> float:
+        """EV of playing on from a hand with hit/stand only."""
+        if hard > 21:
+            return -1.0
+        key = (composition, upcard, hard, hasAce)
+        ev = self.cache.get(key)
+        if ev is None:
+            total = softTotal(hard, hasAce)[0]
+            ev = self.standEV(composition, upcard, total)
+            if total < 21:
+                ev = max(ev, self.hitEV(composition, upcard, hard, hasAce))
+            self.cache.put(key, ev)
+        return ev
+
+    def hitEV(self, composition: Composition, upcard: int, hard: int, hasAce: bool) -> float:
+        return sum(chance * self.bestEV(after, upcard, hard + value, hasAce or value == 1)
+                   for value, chance, after in self.draws(composition))
+
+    def doubleEV(self, composition: Composition, upcard: int, hard: int, hasAce: bool) -> float:
+        return 2 * sum(chance * self.standEV(after, upcard, softTotal(hard + value, hasAce or value == 1)[0])
+                       for value, chance, after in self.draws(composition))
+
+    def splitHandEV(self, composition: Composition, upcard: int, pairValue: int, splitsLeft: int) -> float:
+        """EV of one hand after a split, starting from a single card of pairValue."""
+        key = ("split", composition, upcard, pairValue, splitsLeft)
+        ev = self.cache.get(key)
+        if ev is not None:
+            return ev
+
+        canDouble = self.rules.double_allowed and self.rules.double_after_split
+        ev = 0.0
+        for value, chance, after in self.draws(composition):
+            hard, hasAce = pairValue + value, pairValue == 1 or value == 1
+            if softTotal(hard, hasAce)[0] == 21:
+                outcome = self.blackjackEV(after, upcard)
+            else:
+                outcome = max(self.standEV(after, upcard, softTotal(hard, hasAce)[0]), self.hitEV(after, upcard, hard, hasAce))
+                if canDouble:
+                    outcome = max(outcome, self.doubleEV(after, upcard, hard, hasAce))
+            if value == pairValue and splitsLeft > 0:
+                outcome = max(outcome, 2 * self.splitHandEV(after, upcard, pairValue, splitsLeft - 1))
+            ev += chance * outcome
+        self.cache.put(key, ev)
+        return ev
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    numDecks = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    shoe = tuple(4 * numDecks if value < 10 else 16 * numDecks for value in range(1, 11))
+    engine = ExpectedValueEngine()
+    start = time.perf_counter()
+    results = engine.evaluateAll(shoe)
+    elapsed = time.perf_counter() - start
+    for (first, second, upcard), values in sorted(results.items()):
+        if upcard in (6, 10):
+            print(f"{first:>2},{second:<2} vs {upcard:>2}: {values}")
+    print(f"{len(results)} situations in {elapsed:.1f}s "
+          f"({len(engine.cache)} player states, {len(engine.dealer.cache)} dealer states cached)")
@@ -0,0 +1,203 @@
+import struct
+from typing import BinaryIO, Dict, List
+
+from blackjacj import BlackjackGame, NUM_PLAYERS, HIT, STAND, SPLIT, DOUBLE
+from deck import Card, Ranks, Suits
+
+# NumPy is only needed to read histories back; recording a game works without it.
+
+MAGIC = b"BJHH"
+VERSION = 2
+# File header: magic, version, record size, seats per record
+FILE_HEADER = struct.Struct("<4sHHH")
+
+# Fixed capacity of a record. Rounds that overflow any of these are stored truncated and flagged.
+MAX_CARDS = 10
+MAX_HANDS = 4
+MAX_ACTIONS = 16
+# Cards are stored as Card.code + 1, so the zero padding struct adds marks an empty slot
+NO_CARD = 0
+
+# flags
+RESHUFFLED = 1  # The shoe was shuffled since the previous round or during this one
+TRUNCATED = 2
+
+ACTION_CODES = {HIT: 1, STAND: 2, DOUBLE: 3, SPLIT: 4}
+ACTIONS_BY_CODE = {code: action for action, code in ACTION_CODES.items()}
+
+# Stored card byte -> card
+CARDS_BY_BYTE: Dict[int, Card] = {card.code + 1: card for card in
+                                  (Card(rank.value, suit.value) for rank in Ranks for suit in Suits)}
+
+# One round, little-endian and unpadded. Per hand: cards, final total, bet, payout (bet included).
+# Per seat: number of hands (0 when the seat sat out), actions in play order, then the hands.
+# Bets and payouts are 64-bit, the ledger's width, so no stake a game accepts can overflow them.
+HAND_FORMAT = f"{MAX_CARDS}sBqq"
+SEAT_FORMAT = f"B{MAX_ACTIONS}s" + HAND_FORMAT * MAX_HANDS
+# round number, shoe position before the deal, flags, dealer cards, dealer total, then every seat
+ROUND_RECORD = struct.Struct(f"<QHB{MAX_CARDS}sB" + SEAT_FORMAT * NUM_PLAYERS)
+
+
+def roundDtype():
+    """The NumPy structured dtype laid out exactly like ROUND_RECORD."""
+    import numpy as np
+    hand = np.dtype([("cards", "u1", (MAX_CARDS,)), ("total", "u1"), ("bet", "<i8"), ("payout", "<i8")])
+    seat = np.dtype([("num_hands", "u1"), ("actions", "u1", (MAX_ACTIONS,)), ("hands", hand, (MAX_HANDS,))])
+    dtype = np.dtype([("round", "<u8"), ("shoe_position", "<u2"), ("flags", "u1"),
+                      ("dealer_cards", "u1", (MAX_CARDS,)), ("dealer_total", "u1"),
+                      ("seats", seat, (NUM_PLAYERS,))])
+    assert dtype.itemsize == ROUND_RECORD.size
+    return dtype
+
+EMPTY_HAND = (b"", 0, 0, 0)
+EMPTY_SEAT = (0, b"") + EMPTY_HAND * MAX_HANDS
+
+
+class HandHistoryWriter:
+    """
+    Records every round a game plays as one fixed-width ROUND_RECORD. Once attached to a
+    game it is told the shoe position at the deal, each decision and the settled round; records are packed into a preallocated buffer that is written out
+    in bulk every bufferRounds rounds.
+    """
+
+    def __init__(self, file: BinaryIO, bufferRounds: int = 4096):
+        self.file = file
+        self.buffer = bytearray(ROUND_RECORD.size * bufferRounds)
+        self.bufferRounds = bufferRounds
+        self.buffered = 0
+        self.rounds = 0
+        self.actions: List[bytearray] = [bytearray() for _ in range(NUM_PLAYERS)]
+        self.shoe_position = 0
+        self.last_position = 0
+        self.flags = 0
+        file.write(FILE_HEADER.pack(MAGIC, VERSION, ROUND_RECORD.size, NUM_PLAYERS))
+
+    def attach(self, game: BlackjackGame):
+        game.history = self
+
+    # Game hooks
+
+    def startRound(self, shoe_position: int):
+        # The shoe only moves backwards when it has been shuffled since the last round
+        self.flags = RESHUFFLED if shoe_position < self.last_position else 0
+        self.shoe_position = shoe_position
+
+    def action(self, index: int, decision: int):
+        self.actions[index].append(ACTION_CODES[decision])
+
+    def endRound(self, game: BlackjackGame):
+        flags = self.flags
+        self.last_position = game.deck.position
+        if self.last_position < self.shoe_position:
+            flags |= RESHUFFLED
+        dealer = game.dealer_hand
+        fields = [self.rounds, self.shoe_position, 0, bytes([card.code + 1 for card in dealer.cards]), dealer.value]
+        truncated = len(dealer.cards) > MAX_CARDS
+        for index, player in enumerate(game.players):
+            hands = player.hands
+            if not hands[0].active_bet:
+                fields.extend(EMPTY_SEAT)
+                continue
+            actions = self.actions[index]
+            truncated |= len(hands) > MAX_HANDS or len(actions) > MAX_ACTIONS
+            fields.append(min(len(hands), MAX_HANDS))
+            fields.append(bytes(actions))
+            for hand in hands[:MAX_HANDS]:
+                cards = hand.cards
+                truncated |= len(cards) > MAX_CARDS
+                fields += (bytes([card.code + 1 for card in cards]), hand.value, hand.active_bet, hand.payoutDisplay)
+            fields.extend(EMPTY_HAND * (MAX_HANDS - len(hands)))
+            actions.clear()
+        fields[2] = flags | TRUNCATED if truncated else flags
+
+        ROUND_RECORD.pack_into(self.buffer, self.buffered * ROUND_RECORD.size, *fields)
+        self.buffered += 1
+        self.rounds += 1
+        if self.buffered == self.bufferRounds:
+            self.flush()
+
+    def flush(self):
+        if self.buffered:
+            self.file.write(memoryview(self.buffer)[:self.buffered * ROUND_RECORD.size])
+            self.buffered = 0
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class HandHistory:
+    """
+    A history file memory-mapped as a NumPy structured array of rounds, so slicing and
+    column access (e.g. records["seats"]["hands"]["payout"]) read the file in place.
+    """
+
+    def __init__(self, path: str):
+        import numpy as np
+        with open(path, "rb") as file:
+            magic, version, recordSize, numSeats = FILE_HEADER.unpack(file.read(FILE_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} hand history")
+        dtype = roundDtype()
+        if recordSize != dtype.itemsize or numSeats != NUM_PLAYERS:
+            raise ValueError(f"{path} has {recordSize}-byte records for {numSeats} seats, "
+                             f"expected {dtype.itemsize} for {NUM_PLAYERS}")
+        self.path = path
+        self.records = np.memmap(path, dtype=dtype, mode="r", offset=FILE_HEADER.size)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, item):
+        return self.records[item]
+
+    @staticmethod
+    def cards(codes) -> List[Card]:
+        """The cards in one cards field, in the order they were dealt."""
+        return [CARDS_BY_BYTE[int(code)] for code in codes if code != NO_CARD]
+
+    @staticmethod
+    def actions(codes) -> List[int]:
+        return [ACTIONS_BY_CODE[int(code)] for code in codes if code]
+
+
+if __name__ == "__main__":
+    import os
+    import random
+    import sys
+    import tempfile
+    import time
+
+    import numpy as np
+
+    from simulator import Simulator
+    from strategy import ACTION_NAMES, BasicStrategy
+
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    path = os.path.join(tempfile.gettempdir(), "hands.bjhh")
+    simulator = Simulator(playerPolicy=BasicStrategy().decide, rng=random.Random(1))
+    with HandHistoryWriter(open(path, "wb")) as writer:
+        writer.attach(simulator)
+        start = time.perf_counter()
+        simulator.run(rounds)
+        elapsed = time.perf_counter() - start
+    print(f"Recorded {rounds:,} rounds in {elapsed:.2f}s, {os.path.getsize(path) / rounds:.0f} bytes per round")
+
+    start = time.perf_counter()
+    history = HandHistory(path)
+    hands = history["seats"]["hands"]
+    played = hands["bet"] > 0
+    net = (hands["payout"] - hands["bet"])[played].sum()
+    print(f"Read {len(history):,} rounds in {time.perf_counter() - start:.3f}s: {played.sum():,} hands, "
+          f"net {net:+,} chips, dealer busts {np.mean(history['dealer_total'] > 21):.2%}")
+    first = history[0]
+    print("First round: dealer", " ".join(map(str, HandHistory.cards(first["dealer_cards"]))), "/ seat 1",
+          " ".join(map(str, HandHistory.cards(first["seats"][0]["hands"][0]["cards"]))),
+          [ACTION_NAMES[action] for action in HandHistory.actions(first["seats"][0]["actions"])])
@@ -0,0 +1,139 @@
+import struct
+from array import array
+from typing import BinaryIO, Iterator, Sequence, Tuple
+
+BANK_WALLET_ID = -1
+# Source of deposits: money entering the table from outside any wallet
+EXTERNAL_WALLET_ID = -2
+
+# One transfer: from wallet id, to wallet id, whole-chip amount
+TRANSFER_RECORD = struct.Struct('<hhq')
+
+
+class Ledger:
+    """
+    Wallet balances in one contiguous array, the dealer's (BANK_WALLET_ID) in slot 0 and
+    player i's in slot i + 1, with every movement appended to a binary journal of
+    fixed-size records. Replaying a journal from the start rebuilds every balance.
+
+    The journal goes to log when a writable binary file is given, otherwise it is kept in
+    memory unless journal is False.
+    """
+
+    def __init__(self, numPlayers: int, log: BinaryIO = None, journal: bool = True):
+        self.numPlayers = numPlayers
+        self.balances = array('q', [0] * (numPlayers + 1))
+        self.log = log
+        self.journal = bytearray() if journal and log is None else None
+        self.journaling = log is not None or self.journal is not None
+        self.walletIds = frozenset(range(BANK_WALLET_ID, numPlayers))
+
+    def slot(self, wallet_id: int) -> int:
+        if not BANK_WALLET_ID <= wallet_id < self.numPlayers:
+            raise ValueError(f"Invalid wallet ID: {wallet_id}")
+        return wallet_id + 1
+
+    def balance(self, wallet_id: int) -> int:
+        return self.balances[self.slot(wallet_id)]
+
+    def deposit(self, amount: int, to_wallet_id: int):
+        self.balances[self.slot(to_wallet_id)] += amount
+        self.record(TRANSFER_RECORD.pack(EXTERNAL_WALLET_ID, to_wallet_id, amount))
+
+    def transfer(self, amount: int, from_wallet_id: int, to_wallet_id: int):
+        source = self.slot(from_wallet_id)
+        target = self.slot(to_wallet_id)
+        if self.balances[source] < amount:
+            raise ValueError(f"{self.walletName(from_wallet_id)} insufficient funds: {self.balances[source]} < {amount}")
+        self.balances[source] -= amount
+        self.balances[target] += amount
+        if self.journaling:
+            self.record(TRANSFER_RECORD.pack(from_wallet_id, to_wallet_id, amount))
+
+    def checkIds(self, wallet_ids: Sequence[int]):
+        if not self.walletIds.issuperset(wallet_ids):
+            raise ValueError(f"Invalid wallet ID in {list(wallet_ids)}")
+
+    def transferBatch(self, amounts: Sequence[int], from_wallet_ids: Sequence[int], to_wallet_ids: Sequence[int]):
+        """
+        Settles many transfers as one: every paying wallet must cover its total outflow up
+        front, otherwise nothing moves. Records are journaled in a single write.
+        """
+        self.checkIds(from_wallet_ids)
+        self.checkIds(to_wallet_ids)
+        balances = self.balances
+
+        outflows = {}
+        for wallet_id, amount in zip(from_wallet_ids, amounts):
+            outflows[wallet_id] = outflows.get(wallet_id, 0) + amount
+        for wallet_id, outflow in outflows.items():
+            if balances[wallet_id + 1] < outflow:
+                raise ValueError(f"{self.walletName(wallet_id)} insufficient funds: {balances[wallet_id + 1]} < {outflow}")
+
+        for from_wallet_id, to_wallet_id, amount in zip(from_wallet_ids, to_wallet_ids, amounts):
+            balances[from_wallet_id + 1] -= amount
+            balances[to_wallet_id + 1] += amount
+        if self.journaling:
+            self.journalBatch(amounts, from_wallet_ids, to_wallet_ids)
+
+    def payMany(self, amounts: Sequence[int], from_wallet_id: int, to_wallet_ids: Sequence[int]):
+        """transferBatch from a single wallet, such as the dealer settling a round."""
+        self.checkIds(to_wallet_ids)
+        balances = self.balances
+        source = self.slot(from_wallet_id)
+        outflow = sum(amounts)
+        if balances[source] < outflow:
+            raise ValueError(f"{self.walletName(from_wallet_id)} insufficient funds: {balances[source]} < {outflow}")
+
+        balances[source] -= outflow
+        for to_wallet_id, amount in zip(to_wallet_ids, amounts):
+            balances[to_wallet_id + 1] += amount
+        if self.journaling:
+            self.journalBatch(amounts, [from_wallet_id] * len(amounts), to_wallet_ids)
+
+    def collectMany(self, amounts: Sequence[int], from_wallet_ids: Sequence[int], to_wallet_id: int):
+        """transferBatch into a single wallet from distinct ones, such as the dealer taking a round's bets."""
+        self.checkIds(from_wallet_ids)
+        balances = self.balances
+        target = self.slot(to_wallet_id)
+        for from_wallet_id, amount in zip(from_wallet_ids, amounts):
+            if balances[from_wallet_id + 1] < amount:
+                raise ValueError(f"{self.walletName(from_wallet_id)} insufficient funds: {balances[from_wallet_id + 1]} < {amount}")
+
+        for from_wallet_id, amount in zip(from_wallet_ids, amounts):
+            balances[from_wallet_id + 1] -= amount
+        balances[target] += sum(amounts)
+        if self.journaling:
+            self.journalBatch(amounts, from_wallet_ids, [to_wallet_id] * len(amounts))
+
+    def journalBatch(self, amounts: Sequence[int], from_wallet_ids: Sequence[int], to_wallet_ids: Sequence[int]):
+        pack = TRANSFER_RECORD.pack
+        self.record(b"".join(pack(from_wallet_id, to_wallet_id, amount)
+                             for from_wallet_id, to_wallet_id, amount in zip(from_wallet_ids, to_wallet_ids, amounts)))
+
+    def record(self, data: bytes):
+        if self.log is not None:
+            self.log.write(data)
+        elif self.journal is not None:
+            self.journal += data
+
+    @staticmethod
+    def walletName(wallet_id: int) -> str:
+        return "Dealer" if wallet_id == BANK_WALLET_ID else f"Player {wallet_id}"
+
+    @staticmethod
+    def records(data: bytes) -> Iterator[Tuple[int, int, int]]:
+        return TRANSFER_RECORD.iter_unpack(data)
+
+    @classmethod
+    def replay(cls, data: bytes, numPlayers: int, upTo: int = None) -> "Ledger":
+        """Rebuilds a ledger from a journal, optionally stopping after the first upTo records."""
+        ledger = cls(numPlayers, journal=False)
+        balances = ledger.balances
+        for index, (from_wallet_id, to_wallet_id, amount) in enumerate(cls.records(data)):
+            if upTo is not None and index >= upTo:
+                break
+            if from_wallet_id != EXTERNAL_WALLET_ID:
+                balances[ledger.slot(from_wallet_id)] -= amount
+            balances[ledger.slot(to_wallet_id)] += amount
+        return ledger
@@ -0,0 +1,117 @@
+import asyncio
+import time
+from typing import List
+
+from server import DEFAULT_PORT, GameServer
+
+
+class LoadStats:
+    """What the bots saw: rounds settled, server response times and protocol errors."""
+
+    def __init__(self):
+        self.rounds = 0
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.connected = 0
+        self.failedConnections = 0
+
+    def percentile(self, p: float) -> float:
+        ordered = sorted(self.latencies)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def report(self, elapsed: float) -> str:
+        return (f"{self.connected:,} bots ({self.failedConnections:,} failed to connect), "
+                f"{self.rounds:,} seat-rounds in {elapsed:.1f}s = {self.rounds / elapsed:,.0f} rounds/s, "
+                f"{self.errors} errors\n"
+                f"action latency p50 {self.percentile(50) * 1000:.2f} ms, p99 {self.percentile(99) * 1000:.2f} ms "
+                f"over {len(self.latencies):,} actions")
+
+
+async def playBot(host: str, port: int, stats: LoadStats, deadline: float):
+    """
+    One seat at full speed: bets the minimum, hits below 17 and stands otherwise. Latency
+    is measured from the seat's own BET or ACT prompt arriving to the server's OK for the
+    answer, so waiting on other seats and the dealer is not counted.
+    """
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        stats.failedConnections += 1
+        return
+    stats.connected += 1
+    writer.write(b"JOIN\n")
+    prompted = None
+    quitting = False
+
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        kind, *fields = line.decode().split()
+
+        if kind == "OK":
+            if prompted is not None:
+                stats.latencies.append(time.perf_counter() - prompted)
+                prompted = None
+            continue
+        if kind == "BET":
+            prompted = time.perf_counter()
+            minBet, wallet = int(fields[0]), int(fields[1])
+            if quitting:
+                answer = "0"
+            elif time.perf_counter() >= deadline or wallet < minBet:
+                quitting = True
+                answer = "QUIT\n0"
+            else:
+                answer = str(minBet)
+        elif kind == "ACT":
+            prompted = time.perf_counter()
+            total = int(fields[1])
+            answer = "H" if total < 17 else "S"
+        elif kind == "RESULT":
+            stats.rounds += 1
+            continue
+        elif kind == "ERR":
+            stats.errors += 1
+            continue
+        else:
+            continue
+
+        writer.write((answer + "\n").encode())
+
+    writer.close()
+
+
+async def runLoad(connections: int, seconds: float, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> LoadStats:
+    stats = LoadStats()
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(playBot(host, port, stats, deadline) for _ in range(connections)))
+    return stats
+
+
+if __name__ == "__main__":
+    import sys
+
+    # loadbot.py [connections] [seconds] [port | local]; 'local' hosts the server in this process
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    target = sys.argv[3] if len(sys.argv) > 3 else str(DEFAULT_PORT)
+
+    async def main():
+        server = None
+        port = DEFAULT_PORT if target == "local" else int(target)
+        if target == "local":
+            server = GameServer(port=0)
+            await server.start()
+            port = server.port
+        start = time.perf_counter()
+        stats = await runLoad(connections, seconds, port=port)
+        elapsed = time.perf_counter() - start
+        print(stats.report(elapsed))
+        if server is not None:
+            print(f"{len(server.tables):,} tables, {server.roundsPlayed():,} table rounds")
+            server.close()
+
+    asyncio.run(main())
@@ -0,0 +1,234 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
+
+import numpy as np
+
+from blackjacj import BlackjackRules, SouthPointRules, NUM_DECKS
+from batchsim import BatchSimulator
+from simulator import Simulator, SimulationResult
+from stats import RunningStats, StratifiedStats, stratumWeights, upcardWeights, zScore
+
+ENGINE_BATCH = "batch"
+ENGINE_SIMULATOR = "simulator"
+
+DEFAULT_CHUNK_ROUNDS = {
+    ENGINE_BATCH: 500_000,
+    ENGINE_SIMULATOR: 10_000,
+}
+
+# Estimators for estimateEV
+METHOD_PLAIN = "plain"
+METHOD_ANTITHETIC = "antithetic"  # Batch engine only
+METHOD_STRATIFIED = "stratified"
+
+BATCH_SIZE = 100_000
+
+
+def chunkSeed(seed: int, chunkIndex: int) -> np.random.SeedSequence:
+    """
+    Independent RNG stream for one chunk of a run. Streams are derived from the run
+    seed and the chunk index only, so they do not depend on how many workers there are.
+    """
+    return np.random.SeedSequence(seed, spawn_key=(chunkIndex,))
+
+
+def runChunk(engine: str, rules: BlackjackRules, rounds: int, seed: int, chunkIndex: int, options: dict) -> SimulationResult:
+    sequence = chunkSeed(seed, chunkIndex)
+    if engine == ENGINE_BATCH:
+        simulator = BatchSimulator(rules=rules, rng=np.random.default_rng(sequence), **options)
+    elif engine == ENGINE_SIMULATOR:
+        rng = random.Random(int.from_bytes(sequence.generate_state(4).tobytes(), "little"))
+        simulator = Simulator(rules=rules, rng=rng, **options)
+    else:
+        raise ValueError(f"Unknown simulation engine: {engine}")
+    return simulator.run(rounds)
+
+
+def runMonteCarlo(
+    rounds: int,
+    seed: int = 0,
+    engine: str = ENGINE_BATCH,
+    rules: BlackjackRules = SouthPointRules,
+    workers: int = None,
+    chunkRounds: int = None,
+    **options
+) -> SimulationResult:
+    """
+    Shards a run into fixed-size chunks and plays them on a process pool. Each chunk has
+    its own RNG stream and partial results are merged in chunk order, so a given seed
+    gives bit-identical totals whatever the worker count. Extra keyword arguments are
+    passed to the engine (policies, numDecks, ...) and must be picklable.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunkRounds = chunkRounds or DEFAULT_CHUNK_ROUNDS[engine]
+    sizes = [min(chunkRounds, rounds - start) for start in range(0, rounds, chunkRounds)]
+
+    result = SimulationResult()
+    if workers == 1:
+        for chunkIndex, size in enumerate(sizes):
+            result.merge(runChunk(engine, rules, size, seed, chunkIndex, options))
+        return result
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        partials = pool.map(runChunk, [engine] * len(sizes), [rules] * len(sizes), sizes,
+                            [seed] * len(sizes), range(len(sizes)), [options] * len(sizes))
+        for partial in partials:
+            result.merge(partial)
+    return result
+
+
+def newEstimator(method: str, engine: str, options: dict):
+    """
+    The estimator for a method. Batch engine rounds are one independent seat each and are
+    stratified by upcard and the player's first two cards. Simulator rounds seat a whole
+    table against one dealer hand, so each round is one sample, the mean over its seats,
+    stratified by the upcard alone.
+    """
+    if method == METHOD_STRATIFIED and engine == ENGINE_SIMULATOR:
+        return StratifiedStats(upcardWeights())
+    if method == METHOD_STRATIFIED:
+        numDecks = options.get("numDecks", 1 if engine == ENGINE_BATCH else NUM_DECKS)
+        return StratifiedStats(stratumWeights(numDecks))
+    if method in (METHOD_PLAIN, METHOD_ANTITHETIC):
+        return RunningStats()
+    raise ValueError(f"Unknown estimation method: {method}")
+
+
+def estimateChunk(engine: str, rules: BlackjackRules, rounds: int, seed: int, chunkIndex: int, method: str, options: dict):
+    """One chunk of estimateEV: an estimator fed rounds rounds from the chunk's own RNG stream."""
+    sequence = chunkSeed(seed, chunkIndex)
+    estimator = newEstimator(method, engine, options)
+    if engine == ENGINE_BATCH:
+        simulator = BatchSimulator(rules=rules, rng=np.random.default_rng(sequence), **options)
+        for start in range(0, rounds, BATCH_SIZE):
+            size = min(BATCH_SIZE, rounds - start)
+            if method == METHOD_ANTITHETIC:
+                net = simulator.playBatch(size, antithetic=True).net
+                # One sample per antithetic pair: the mean of its two rounds
+                estimator.addBatch((net[:size // 2] + net[size // 2:]) / 2)
+            else:
+                outcome = simulator.playBatch(size)
+                estimator.addBatch(outcome.net, outcome.strata)
+    elif engine == ENGINE_SIMULATOR:
+        if method == METHOD_ANTITHETIC:
+            # Shoes played at a full table drift apart after the first card they differ on,
+            # so paired shoes barely correlate; the batch engine pairs single rounds instead
+            raise ValueError("Antithetic estimates need the batch engine")
+        rng = random.Random(int.from_bytes(sequence.generate_state(4).tobytes(), "little"))
+        simulator = Simulator(rules=rules, rng=rng, **options)
+        simulator.stats = estimator
+        simulator.run(rounds)
+    else:
+        raise ValueError(f"Unknown simulation engine: {engine}")
+    return estimator
+
+
+class EVEstimate:
+    """Where estimateEV stopped: the estimator, the rounds it took and whether it reached the target."""
+
+    def __init__(self, estimator, rounds: int, confidence: float, targetHalfWidth: float):
+        self.estimator = estimator
+        self.rounds = rounds
+        self.confidence = confidence
+        self.targetHalfWidth = targetHalfWidth
+
+    @property
+    def mean(self) -> float:
+        return self.estimator.estimate()
+
+    @property
+    def standardError(self) -> float:
+        return self.estimator.standardError()
+
+    @property
+    def halfWidth(self) -> float:
+        return self.estimator.halfWidth(self.confidence)
+
+    @property
+    def converged(self) -> bool:
+        return self.halfWidth <= self.targetHalfWidth
+
+    def __str__(self):
+        status = "converged" if self.converged else "stopped at the round limit"
+        return (f"EV {self.mean:+.5f} ± {self.halfWidth:.5f} units/hand ({self.confidence:.0%}, "
+                f"SE {self.standardError:.5f}) after {self.rounds:,} rounds, {status}")
+
+
+def estimateEV(
+    halfWidth: float,
+    confidence: float = 0.95,
+    seed: int = 0,
+    engine: str = ENGINE_BATCH,
+    method: str = METHOD_ANTITHETIC,
+    rules: BlackjackRules = SouthPointRules,
+    workers: int = None,
+    chunkRounds: int = None,
+    maxRounds: int = 1_000_000_000,
+    progress: Callable[[object, int], None] = None,
+    **options
+) -> EVEstimate:
+    """
+    Plays chunks until the confidence interval for EV per hand is no wider than
+    ±halfWidth, or maxRounds is reached. Chunks run a wave at a time on the pool but are
+    merged and checked in chunk order, and chunks past the stopping point are discarded,
+    so a given seed stops at the same round with the same estimate whatever the worker
+    count. progress(estimator, rounds) is called after every chunk.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunkRounds = chunkRounds or DEFAULT_CHUNK_ROUNDS[engine]
+    if method == METHOD_ANTITHETIC and chunkRounds % 2:
+        raise ValueError(f"Antithetic chunks pair rounds up, so need an even size, not {chunkRounds}")
+    z = zScore(confidence)
+    estimator = newEstimator(method, engine, options)
+    rounds = 0
+    chunkIndex = 0
+
+    def done() -> bool:
+        return rounds >= maxRounds or z * estimator.standardError() <= halfWidth
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while not done():
+            wave = range(chunkIndex, chunkIndex + workers)
+            if pool is None:
+                partials = (estimateChunk(engine, rules, chunkRounds, seed, index, method, options) for index in wave)
+            else:
+                partials = pool.map(estimateChunk, [engine] * workers, [rules] * workers, [chunkRounds] * workers,
+                                    [seed] * workers, wave, [method] * workers, [options] * workers)
+            for partial in partials:
+                estimator.merge(partial)
+                rounds += chunkRounds
+                chunkIndex += 1
+                if progress is not None:
+                    progress(estimator, rounds)
+                if done():
+                    break
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return EVEstimate(estimator, rounds, confidence, halfWidth)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    if sys.argv[1:2] == ["--ci"]:
+        # montecarlo.py --ci [half width] [seed]: how long each estimator takes to converge
+        target = float(sys.argv[2]) if len(sys.argv) > 2 else 0.001
+        seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+        for method in (METHOD_PLAIN, METHOD_STRATIFIED, METHOD_ANTITHETIC):
+            start = time.perf_counter()
+            estimate = estimateEV(target, seed=seed, method=method)
+            print(f"{method:<11} {estimate} in {time.perf_counter() - start:.1f}s")
+        sys.exit()
+
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    start = time.perf_counter()
+    result = runMonteCarlo(rounds, seed=seed)
+    elapsed = time.perf_counter() - start
+    print(result)
+    print(f"Variance: {result.variance():.5f} units^2, {rounds / elapsed:,.0f} rounds/s on {os.cpu_count()} cores")
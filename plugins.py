@@ -0,0 +1,169 @@
+import random
+from typing import Callable, List, Sequence
+
+import numpy as np
+
+from blackjacj import HandStates, NUM_PLAYERS, SPLIT
+from counting import CardCounter, CountSystem
+from simulator import PolicyBettor, PolicyStrategy, SimulationResult, Simulator
+from strategy import BasicStrategy
+
+# The plugin call shapes BlackjackGame uses. PromptStrategy and PromptBettor are the terminal's,
+# and PolicyStrategy and PolicyBettor (from simulator.py) the Simulator's defaults:
+# strategy(states) -> one action per hand in the HandStates batch
+BatchStrategy = Callable[[HandStates], Sequence[int]]
+# bettor(seats, wallets, minBet, trueCounts) -> one bet per seat, 0 to sit out
+BatchBettor = Callable[[Sequence[int], Sequence[int], int, Sequence[float]], Sequence[int]]
+
+
+class BasicStrategyPlugin:
+    """BasicStrategy's tables looked up for a whole batch of hands in a few NumPy gathers."""
+
+    def __init__(self, strategy: BasicStrategy = None):
+        strategy = strategy if strategy is not None else BasicStrategy()
+        self.hard = np.array(strategy.hard)
+        self.soft = np.array(strategy.soft)
+        self.split = np.array(strategy.split)
+
+    def __call__(self, states: HandStates) -> np.ndarray:
+        totals = np.asarray(states.totals)
+        upcards = np.asarray(states.upcardValues)
+        canDouble = np.asarray(states.canDouble, dtype=np.intp)
+        actions = np.where(np.asarray(states.soft, dtype=bool), self.soft[canDouble, totals, upcards],
+                           self.hard[canDouble, totals, upcards])
+        splitting = np.asarray(states.canSplit, dtype=bool) & self.split[canDouble, np.asarray(states.pairValues), upcards]
+        return np.where(splitting, SPLIT, actions)
+
+
+class FlatBettor:
+    """Bets units minimum bets on every seat that can afford it."""
+
+    def __init__(self, units: int = 1):
+        self.units = units
+
+    def __call__(self, seats: Sequence[int], wallets: Sequence[int], minBet: int, trueCounts: Sequence[float]) -> np.ndarray:
+        bet = minBet * self.units
+        return np.where(np.asarray(wallets) >= bet, bet, 0)
+
+
+class SpreadBettor:
+    """
+    Bets minBet times spread(trueCounts), e.g. a bankroll.RampSpread, rounded down to
+    whole chips and capped at the wallet; seats that cannot cover the minimum sit out.
+    """
+
+    def __init__(self, spread: Callable[[np.ndarray], np.ndarray]):
+        self.spread = spread
+
+    def __call__(self, seats: Sequence[int], wallets: Sequence[int], minBet: int, trueCounts: Sequence[float]) -> np.ndarray:
+        wallets = np.asarray(wallets)
+        bets = np.minimum((minBet * self.spread(np.asarray(trueCounts, dtype=np.float64))).astype(np.int64), wallets)
+        return np.where(bets >= minBet, bets, 0)
+
+
+class TableBatch:
+    """
+    Many Simulator tables played in lockstep, so plugins are called once per step for
+    all of them rather than once per hand. Each table's round is a roundSteps generator;
+    the hands waiting on a decision across every table go to the strategy as one
+    HandStates batch, and tables between rounds are bet for in one bettor call.
+    """
+
+    def __init__(
+        self,
+        numTables: int,
+        strategy: BatchStrategy,
+        bettor: BatchBettor = None,
+        countSystem: CountSystem = None,
+        seed: int = None,
+        **options
+    ):
+        self.strategy = strategy
+        self.bettor = bettor if bettor is not None else FlatBettor()
+        self.tables: List[Simulator] = []
+        for index in range(numTables):
+            rng = random.Random(f"{seed}/{index}") if seed is not None else None
+            table = Simulator(rng=rng, **options)
+            if countSystem is not None:
+                table.counter = CardCounter(countSystem, table.deck)
+            self.tables.append(table)
+        self.strategyCalls = 0
+        self.bettorCalls = 0
+
+    def placeBets(self, starting: List[int]):
+        tables = self.tables
+        seats = list(range(NUM_PLAYERS)) * len(starting)
+        wallets = [tables[t].players[i].wallet for t in starting for i in range(NUM_PLAYERS)]
+        trueCounts = [tables[t].trueCount() for t in starting for _ in range(NUM_PLAYERS)]
+        bets = self.bettor(seats, wallets, tables[starting[0]].min_bet, trueCounts)
+        self.bettorCalls += 1
+        if len(bets) < len(seats):
+            raise ValueError(f"A table batch needs a bet for every seat: got {len(bets)} for {len(seats)}")
+        for k, t in enumerate(starting):
+            tables[t].placeBets(bets[k * NUM_PLAYERS:(k + 1) * NUM_PLAYERS])
+
+    def run(self, rounds: int) -> SimulationResult:
+        """Plays rounds rounds on every table."""
+        result = SimulationResult()
+        tables = self.tables
+        steps = [None] * len(tables)
+        waiting = [None] * len(tables)  # The seat each table's open round is waiting on
+        played = [0] * len(tables)
+
+        def advance(t: int, decision):
+            try:
+                waiting[t] = steps[t].send(decision)
+            except StopIteration:
+                steps[t] = None
+                played[t] += 1
+
+        while True:
+            starting = [t for t in range(len(tables)) if steps[t] is None and played[t] < rounds]
+            if starting:
+                self.placeBets(starting)
+                for t in starting:
+                    steps[t] = tables[t].roundSteps(result)
+                    advance(t, None)
+
+            deciding = [t for t in range(len(tables)) if steps[t] is not None]
+            if not deciding:
+                if all(count >= rounds for count in played):
+                    return result
+                continue
+
+            states = HandStates()
+            for t in deciding:
+                tables[t].handStates(waiting[t], states)
+            decisions = self.strategy(states)
+            self.strategyCalls += 1
+            for t, decision in zip(deciding, decisions):
+                advance(t, int(decision))
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from bankroll import RampSpread
+    from counting import HI_LO
+
+    numTables = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    basic = BasicStrategy()
+
+    for name, strategy in (("policy adapter", PolicyStrategy(basic.decide)), ("batched tables", BasicStrategyPlugin(basic))):
+        batch = TableBatch(numTables, strategy, seed=1)
+        start = time.perf_counter()
+        result = batch.run(rounds)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<16} {result}")
+        print(f"{'':<16} {result.rounds / elapsed:,.0f} rounds/s, {batch.strategyCalls:,} strategy calls "
+              f"for {result.hands:,} hands, {batch.bettorCalls:,} bettor calls")
+
+    # Same cards and decisions, bets sized by each table's Hi-Lo true count
+    for name, bettor in (("flat bets", FlatBettor()), ("Hi-Lo ramp", SpreadBettor(RampSpread()))):
+        batch = TableBatch(numTables, BasicStrategyPlugin(basic), bettor, countSystem=HI_LO, seed=1)
+        before = sum(player.wallet for table in batch.tables for player in table.players)
+        result = batch.run(rounds)
+        net = sum(player.wallet for table in batch.tables for player in table.players) - before
+        print(f"{name:<16} {net / result.rounds:+.2f} chips per round")
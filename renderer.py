@@ -0,0 +1,207 @@
+import os
+import signal
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Sequence, TextIO, Tuple
+
+from deck import Card, Rank, Suit, cardArt
+
+CURSOR_UP = "\x1b[{}A"
+CLEAR_LINE = "\x1b[2K"
+CLEAR_BELOW = "\x1b[J"
+
+MAX_FPS = 30
+
+
+class FrameBuffer:
+    """
+    A reusable width x height grid of single-character cells. Each frame is composed
+    into the same list, then present() compares it line by line with what is already on
+    screen and repaints only the lines that changed, all in one write.
+    """
+
+    def __init__(self, width: int, height: int, out: TextIO = None):
+        self.width = width
+        self.height = height
+        self.out = out
+        self.cells: List[str] = [" "] * (width * height)
+        self.blank: List[str] = [" "] * (width * height)
+        self.shown: List[str] = []  # Lines currently on screen, top to bottom
+        self.linesBelow = 0  # Lines printed under the frame since it was presented, e.g. typed input
+
+    def resize(self, width: int):
+        if width != self.width:
+            self.width = width
+            self.cells = [" "] * (width * self.height)
+            self.blank = [" "] * (width * self.height)
+            # Wrapped old lines no longer line up with the new ones, so repaint everything
+            self.shown = [None] * len(self.shown)
+
+    def clear(self):
+        self.cells[:] = self.blank
+
+    def put(self, x: int, y: int, symbol: str):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.cells[x + y * self.width] = symbol
+
+    def text(self, x: int, y: int, string: str):
+        for j, char in enumerate(string):
+            self.put(x + j, y, char)
+
+    def blit(self, x: int, y: int, rows: Sequence[str]):
+        """Copies pre-rendered rows into the frame with their top-left at (x, y), clipped to the edges."""
+        width = self.width
+        cells = self.cells
+        for row in rows:
+            if 0 <= y < self.height:
+                start = max(x, 0)
+                end = min(x + len(row), width)
+                if start < end:
+                    base = y * width
+                    cells[base + start:base + end] = row[start - x:end - x]
+            y += 1
+
+    def lines(self) -> List[str]:
+        cells = self.cells
+        width = self.width
+        return ["".join(cells[start:start + width]) for start in range(0, len(cells), width)]
+
+    def present(self, footer: Sequence[str] = ()):
+        """Writes the frame plus any footer lines (e.g. the message line) over the previous frame."""
+        lines = self.lines() + list(footer)
+        shown = self.shown
+        out = []
+        up = len(shown) + self.linesBelow
+        if up:
+            out.append("\r" + CURSOR_UP.format(up))
+        for index, line in enumerate(lines):
+            if index >= len(shown) or shown[index] != line:
+                out.append(CLEAR_LINE + line)
+            out.append("\n")
+        # Anything left underneath: a longer previous footer or an echoed input line
+        if len(shown) > len(lines) or self.linesBelow:
+            out.append(CLEAR_BELOW)
+
+        stream = self.out or sys.stdout
+        stream.write("".join(out))
+        stream.flush()
+        self.shown = lines
+        self.linesBelow = 0
+
+
+class SpriteCache:
+    """
+    Card glyphs rendered once per (rank, suit, flipped, handValue) and reused by every
+    frame, so drawing a card is a dict lookup and a blit.
+    """
+
+    def __init__(self):
+        self.sprites: Dict[tuple, Tuple[str, str, str]] = {}
+
+    def get(self, rank: Rank, suit: Suit, flipped: bool = False, handValue: int = 0) -> Tuple[str, str, str]:
+        key = (rank, suit, flipped, handValue)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.sprites[key] = cardArt(rank, suit, flipped, handValue)
+        return sprite
+
+    def card(self, card: Card) -> Tuple[str, str, str]:
+        return self.get(card.rank, card.suit, card.flipped, card.handValue)
+
+    def handTotal(self, value: int) -> Tuple[str, str, str]:
+        """The single card a condensed hand is drawn as, showing its total."""
+        return self.get(None, None, False, value)
+
+    def __len__(self):
+        return len(self.sprites)
+
+
+# Glyphs are the same for every table, so games share one cache
+SPRITES = SpriteCache()
+
+
+class TerminalSize:
+    """
+    os.get_terminal_size(), queried once and then only again after the terminal reports
+    a resize with SIGWINCH. Where there is no SIGWINCH (or no main thread to install the
+    handler from) every call queries, as before. Falls back to 80x24 off a terminal.
+    """
+
+    def __init__(self, fallback: Tuple[int, int] = (80, 24)):
+        self.fallback = os.terminal_size(fallback)
+        self.size = None
+        self.watching = None  # Decided on first use, so importing never installs a handler
+        self.previousHandler = None
+
+    def watch(self) -> bool:
+        if not hasattr(signal, "SIGWINCH") or threading.current_thread() is not threading.main_thread():
+            return False
+        self.previousHandler = signal.signal(signal.SIGWINCH, self.resized)
+        return True
+
+    def resized(self, signum, frame):
+        self.size = None
+        if callable(self.previousHandler):
+            self.previousHandler(signum, frame)
+
+    def get(self) -> os.terminal_size:
+        if self.watching is None:
+            self.watching = self.watch()
+        if self.size is None or not self.watching:
+            try:
+                self.size = os.get_terminal_size()
+            except OSError:
+                self.size = self.fallback
+        return self.size
+
+    @property
+    def columns(self) -> int:
+        return self.get().columns
+
+
+# One terminal per process, so its size is shared too
+TERMINAL = TerminalSize()
+
+
+class FrameScheduler:
+    """
+    Paces redraws. request() marks the table as changed and draws at most maxFps frames a
+    second, so bursts of changes coalesce into one frame; step() does the same and then
+    holds for stepDelay so a dealt card can be seen. With stepDelay 0 (fast mode) nothing
+    ever sleeps and a round costs only the frames the cap lets through.
+    """
+
+    def __init__(self, draw: Callable[[], object], stepDelay: float = 0.1, maxFps: float = MAX_FPS,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.draw = draw
+        self.stepDelay = stepDelay
+        self.frameInterval = 1 / maxFps if maxFps else 0.0
+        self.clock = clock
+        self.sleep = sleep
+        self.dirty = False
+        self.lastFrame = float("-inf")
+        self.framesDrawn = 0
+
+    def request(self):
+        self.dirty = True
+        if self.clock() - self.lastFrame >= self.frameInterval:
+            self.flush()
+
+    def step(self):
+        self.request()
+        if self.stepDelay > 0:
+            # Whatever the cap held back has to be on screen before the pause
+            self.flush()
+            self.sleep(self.stepDelay)
+
+    def flush(self):
+        if self.dirty:
+            self.draw()
+            self.drawn()
+
+    def drawn(self):
+        """Records a frame drawn outside the scheduler, e.g. one that also prompts for input."""
+        self.dirty = False
+        self.lastFrame = self.clock()
+        self.framesDrawn += 1
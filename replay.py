@@ -0,0 +1,230 @@
+import math
+import struct
+from array import array
+from typing import BinaryIO, Dict, List, Sequence
+
+from blackjacj import BlackjackRules, SouthPointRules, NUM_DECKS, PENETRATION
+from deck import Shoe
+from shuffle import CounterBackend, fisherYates
+from simulator import Simulator, SimulationResult, PlayerPolicy
+
+# Recorded shoes file header: number of shoes, cards per shoe. Orders follow as little-endian uint16.
+SHOES_HEADER = struct.Struct("<II")
+
+
+class ShoesExhausted(IndexError):
+    """A shoe source was asked for a shoe past the last one it has."""
+
+
+def seededOrder(seed: int, index: int, numCards: int) -> array:
+    """
+    Card order of shoe `index` in the stream for `seed`. Each shoe reads its own counter
+    range of a CounterBackend, so any shoe can be rebuilt on its own, in any order.
+    """
+    order = array('H', range(numCards))
+    return fisherYates(order, CounterBackend(seed, counter=index * numCards))
+
+
+class SeededShoes:
+    """
+    Shoes named by (seed, shoe index). Pass as a Shoe's source to deal shoe 0, 1, 2, ...
+    of the stream, or give shoeIndices to deal just those shoes, in that order.
+    """
+
+    def __init__(self, seed: int, shoeIndices: Sequence[int] = None):
+        self.seed = seed
+        self.shoeIndices = shoeIndices
+
+    def key(self, n: int) -> tuple:
+        """The (seed, shoe index) the n-th shuffle deals."""
+        if self.shoeIndices is None:
+            return self.seed, n
+        if n >= len(self.shoeIndices):
+            raise ShoesExhausted(f"Only {len(self.shoeIndices)} shoes to replay")
+        return self.seed, self.shoeIndices[n]
+
+    def order(self, n: int, numCards: int) -> array:
+        seed, index = self.key(n)
+        return seededOrder(seed, index, numCards)
+
+
+class RecordedShoes:
+    """Explicit card orders (indices into Shoe.base_cards), dealt one per shuffle."""
+
+    def __init__(self, orders: List[array] = None):
+        self.orders = orders if orders is not None else []
+
+    def order(self, n: int, numCards: int) -> array:
+        if n >= len(self.orders):
+            raise ShoesExhausted(f"Only {len(self.orders)} recorded shoes to replay")
+        order = self.orders[n]
+        if len(order) != numCards:
+            raise ValueError(f"Recorded shoe {n} holds {len(order)} cards, the shoe has {numCards}")
+        return order
+
+    def save(self, file: BinaryIO):
+        numCards = len(self.orders[0]) if self.orders else 0
+        file.write(SHOES_HEADER.pack(len(self.orders), numCards))
+        for order in self.orders:
+            file.write(order.tobytes())
+
+    @classmethod
+    def load(cls, file: BinaryIO) -> "RecordedShoes":
+        numShoes, numCards = SHOES_HEADER.unpack(file.read(SHOES_HEADER.size))
+        orders = []
+        for _ in range(numShoes):
+            order = array('H')
+            order.frombytes(file.read(numCards * order.itemsize))
+            orders.append(order)
+        return cls(orders)
+
+    def __len__(self):
+        return len(self.orders)
+
+
+class ShoeRecorder:
+    """Listens to a Shoe and keeps a copy of every order it shuffles to, as RecordedShoes."""
+
+    def __init__(self, shoe: Shoe):
+        self.shoe = shoe
+        self.shoes = RecordedShoes()
+        shoe.listeners.append(self)
+        # A shoe shuffled but not dealt from yet is recorded now; a fresh shoe's order is
+        # the unshuffled one, which is never dealt, so it waits for the first shuffle
+        if shoe.shoe_index >= 0 and shoe.position == 0:
+            self.shuffled()
+
+    # Deck listener hooks
+
+    def shuffled(self):
+        self.shoes.orders.append(array('H', self.shoe.order))
+
+    def cardDrawn(self, card):
+        pass
+
+    def cardRevealed(self, card):
+        pass
+
+
+class ShoeResults:
+    """Net units per seat, sampled rounds and rounds per shoe for one policy."""
+
+    def __init__(self, name: str, numShoes: int):
+        self.name = name
+        self.net = [0.0] * numShoes
+        self.samples = [0] * numShoes
+        self.rounds = [0] * numShoes
+
+    def expectedValue(self) -> float:
+        samples = sum(self.samples)
+        return sum(self.net) / samples if samples else 0.0
+
+
+def playShoes(simulator: Simulator, numShoes: int, name: str = "") -> ShoeResults:
+    """
+    Plays rounds until numShoes shoes have been dealt out. Each round counts towards the
+    shoe it started in. Stops early if the simulator's shoe source runs out of shoes.
+    """
+    results = ShoeResults(name, numShoes)
+    deck = simulator.deck
+    total = SimulationResult()
+    while deck.shoe_index < numShoes:
+        index = deck.shoe_index
+        net, samples, rounds = total.net_units, total.samples, total.rounds
+        try:
+            simulator.playRound(total)
+        except ShoesExhausted:
+            break
+        finally:
+            # Whatever the round settled counts, even if the source ran dry during its cleanup
+            results.net[index] += total.net_units - net
+            results.samples[index] += total.samples - samples
+            results.rounds[index] += total.rounds - rounds
+    return results
+
+
+def meanAndError(samples: Sequence[float]) -> tuple:
+    n = len(samples)
+    mean = sum(samples) / n
+    variance = sum((x - mean) ** 2 for x in samples) / (n - 1) if n > 1 else 0.0
+    return mean, math.sqrt(variance / n)
+
+
+class StrategyComparison:
+    """
+    Per-shoe results of several policies played on identical shoes. Differences are
+    estimated from the paired per-shoe differences (common random numbers); the unpaired
+    standard error is what independent shoes would have given for the same work.
+    """
+
+    def __init__(self, results: List[ShoeResults]):
+        self.results = results
+
+    def difference(self, a: int, b: int) -> tuple:
+        """(mean difference in net units per seat per shoe, paired SE, unpaired SE) of policy a minus b."""
+        first, second = self.results[a], self.results[b]
+        mean, pairedError = meanAndError([x - y for x, y in zip(first.net, second.net)])
+        unpairedError = math.hypot(meanAndError(first.net)[1], meanAndError(second.net)[1])
+        return mean, pairedError, unpairedError
+
+    def __str__(self):
+        numShoes = len(self.results[0].net)
+        lines = [f"{numShoes:,} shoes, same cards for every policy"]
+        for results in self.results:
+            mean, error = meanAndError(results.net)
+            lines.append(f"  {results.name:<12} EV {results.expectedValue():+.5f} units/hand, "
+                         f"{mean:+.3f} ± {error:.3f} units/seat/shoe over {sum(results.rounds):,} rounds")
+        base = self.results[0]
+        for b in range(1, len(self.results)):
+            mean, pairedError, unpairedError = self.difference(0, b)
+            reduction = (unpairedError / pairedError) ** 2 if pairedError else math.inf
+            lines.append(f"  {base.name} - {self.results[b].name}: {mean:+.3f} units/seat/shoe, "
+                         f"paired SE {pairedError:.3f} vs unpaired {unpairedError:.3f} "
+                         f"({reduction:.1f}x fewer shoes for the same precision)")
+        return "\n".join(lines)
+
+
+def compareStrategies(
+    policies: Dict[str, PlayerPolicy],
+    numShoes: int,
+    seed: int = 0,
+    rules: BlackjackRules = SouthPointRules,
+    numDecks: int = NUM_DECKS,
+    penetration: float = PENETRATION,
+    shoes=None,
+    **options
+) -> StrategyComparison:
+    """
+    Plays every policy through the same numShoes shoes, by default shoes 0..numShoes-1 of
+    seed's stream (or any shoe source, e.g. RecordedShoes). Extra keyword arguments are
+    passed to each Simulator (betPolicy, startingWallet, ...).
+    """
+    results = []
+    for name, policy in policies.items():
+        source = shoes if shoes is not None else SeededShoes(seed)
+        simulator = Simulator(rules=rules, playerPolicy=policy, numDecks=numDecks, penetration=penetration,
+                              shoes=source, **options)
+        results.append(playShoes(simulator, numShoes, name))
+    return StrategyComparison(results)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from simulator import dealerMimicPolicy, DOUBLE, HIT
+    from strategy import BasicStrategy
+
+    basic = BasicStrategy().decide
+
+    def noDoublePolicy(hand, dealerUpcard, canDouble, canSplit):
+        # Basic strategy, but hits where it would double
+        decision = basic(hand, dealerUpcard, canDouble, canSplit)
+        return HIT if decision == DOUBLE else decision
+
+    numShoes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    start = time.perf_counter()
+    comparison = compareStrategies({"basic": basic, "no doubles": noDoublePolicy, "mimic": dealerMimicPolicy},
+                                   numShoes, seed=1)
+    print(comparison)
+    print(f"{time.perf_counter() - start:.1f}s")
@@ -0,0 +1,314 @@
+import asyncio
+import logging
+from typing import List, Optional, Sequence
+
+from asyncgame import AsyncBlackjackGame
+from blackjacj import BetError, HandStates, NUM_PLAYERS, STARTING_WALLET, HIT, STAND, SPLIT, DOUBLE
+from simulator import UNLIMITED_WALLET
+
+DEFAULT_PORT = 8642
+ACTION_TIMEOUT = 30.0
+
+# Line protocol, one message per line.
+#   client: JOIN                      take the first free seat
+#   server: SEAT <table> <seat> <wallet>
+#   server: BET <min bet> <wallet>    client: <amount>, 0 to sit the round out
+#   server: ACT <hand> <total> <soft> <upcard, ace 11> <canDouble> <canSplit>
+#                                     client: H / S / D / P
+#   server: OK                        the BET or ACT answer was read; a bet the table
+#                                     turns down still gets ERR and a new BET
+#   server: RESULT <net> <wallet>     once per round the seat played
+#   server: INFO <text> / ERR <text>  ERR re-sends the pending BET or ACT afterwards
+#   client: QUIT                      leave after the current round
+ACTION_CODES = {"H": HIT, "S": STAND, "D": DOUBLE, "P": SPLIT}
+
+logger = logging.getLogger(__name__)
+
+
+class Seat:
+    """One connected player. Only the table's coroutine reads from it once seated."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.connected = True
+        self.leaving = False
+        self.closed = asyncio.Event()
+
+    async def send(self, line: str):
+        if self.connected:
+            self.writer.write((line + "\n").encode())
+            try:
+                await self.writer.drain()
+            except ConnectionError:
+                self.connected = False
+
+    async def ask(self, line: str, timeout: float) -> Optional[str]:
+        """Sends a prompt and waits for the answer; None if the player left or timed out."""
+        await self.send(line)
+        while self.connected:
+            try:
+                answer = await asyncio.wait_for(self.reader.readline(), timeout)
+            except (asyncio.TimeoutError, ConnectionError):
+                return None
+            if not answer:
+                self.connected = False
+                return None
+            answer = answer.decode().strip()
+            if answer.upper() == "QUIT":
+                self.leaving = True
+                continue
+            return answer
+        return None
+
+    def close(self):
+        self.connected = False
+        self.writer.close()
+        self.closed.set()
+
+
+class SeatStrategy:
+    """Strategy plugin that asks each hand's player over the line protocol; players who time out stand."""
+
+    def __init__(self, table: "ServerTable"):
+        self.table = table
+
+    async def __call__(self, states: HandStates) -> List[int]:
+        return [await self.ask(k, states) for k in range(len(states))]
+
+    async def ask(self, k: int, states: HandStates) -> int:
+        table = self.table
+        seat = table.seats[states.seats[k]]
+        hand = states.hands[k]
+        upcard = states.upcards[k].rank.score_value
+        prompt = (f"ACT {table.active_hand_idx} {hand.getValue()} {int(hand.isSoft())} {upcard} "
+                  f"{int(states.canDouble[k])} {int(states.canSplit[k])}")
+        while True:
+            if table.message_content:
+                await seat.send(f"INFO {table.message_content}")
+                table.message_content = ""
+            answer = await seat.ask(prompt, table.actionTimeout)
+            if answer is None:
+                return STAND
+            decision = ACTION_CODES.get(answer.upper())
+            if decision is not None:
+                await seat.send("OK")
+                return decision
+            await seat.send("ERR Action must be H, S, D or P")
+
+
+class SeatBettor:
+    """Bettor plugin that asks every seat's player concurrently; players who time out sit out."""
+
+    def __init__(self, table: "ServerTable"):
+        self.table = table
+
+    async def __call__(self, seats: Sequence[int], wallets: Sequence[int], minBet: int,
+                       trueCounts: Sequence[float]) -> List[int]:
+        return await asyncio.gather(*(self.ask(seat, wallet, minBet) for seat, wallet in zip(seats, wallets)))
+
+    async def ask(self, index: int, wallet: int, minBet: int) -> int:
+        seat = self.table.seats[index]
+        while True:
+            answer = await seat.ask(f"BET {minBet} {wallet}", self.table.actionTimeout)
+            if answer is None:
+                return 0
+            try:
+                bet = int(answer)
+            except ValueError:
+                await seat.send("ERR Bet must be a whole number")
+                continue
+            await seat.send("OK")
+            return bet
+
+
+class ServerTable(AsyncBlackjackGame):
+    """
+    A table whose seats are network connections. Seated players bet concurrently, then
+    act in seat order through the same startHand/applyDecision steps as every other
+    game; SeatBettor and SeatStrategy are its plugins. Players who time out sit the round out or stand. The house cannot go broke,
+    and a player taking a seat is topped up to startingWallet.
+    """
+
+    def __init__(self, tableId: int, startingWallet: int = STARTING_WALLET, actionTimeout: float = ACTION_TIMEOUT):
+        super().__init__(reader=None, startingWallet=startingWallet, dealerWallet=UNLIMITED_WALLET)
+        self.tableId = tableId
+        self.startingWallet = startingWallet
+        self.actionTimeout = actionTimeout
+        self.seats: List[Optional[Seat]] = [None] * NUM_PLAYERS
+        self.occupied = asyncio.Event()
+        # The coroutine playing the table, once GameServer starts it
+        self.task: Optional[asyncio.Task] = None
+        self.strategy = SeatStrategy(self)
+        self.bettor = SeatBettor(self)
+
+    def drawGame(self, input_request="") -> str | None:
+        # Players render their own view from the protocol
+        pass
+
+    def animate(self):
+        pass
+
+    def freeSeat(self) -> Optional[int]:
+        for index, seat in enumerate(self.seats):
+            if seat is None:
+                return index
+        return None
+
+    async def sit(self, index: int, seat: Seat):
+        self.seats[index] = seat
+        wallet = self.players[index].wallet
+        if wallet < self.startingWallet:
+            self.ledger.deposit(self.startingWallet - wallet, index)
+        self.occupied.set()
+        await seat.send(f"SEAT {self.tableId} {index} {self.players[index].wallet}")
+
+    async def run(self):
+        while True:
+            await self.occupied.wait()
+            await self.playRound()
+
+    async def playRound(self):
+        await self.bettingPhase()
+        active_hands = [i for i in range(NUM_PLAYERS) if self.players[i].hands[0].active_bet > 0]
+        if active_hands:
+            self.initialDealPhase()
+            for index in active_hands:
+                await self.playerDecisionPhase(index)
+            self.dealerDecisionPhase()
+            self.makePayouts()
+            await asyncio.gather(*(self.reportResult(index) for index in active_hands))
+        else:
+            # Everyone sat out; don't spin the loop
+            await asyncio.sleep(0.01)
+
+        self.cleanUpRound()
+        self.roundsPlayed += 1
+        self.standUp()
+
+    async def bettingPhase(self):
+        seats = [index for index, seat in enumerate(self.seats) if seat is not None]
+        while seats:
+            bets = await self.bettor(*self.betArguments(seats))
+            # Rejected bets are asked again, of those seats only
+            retry = list(seats[len(bets):])
+            for index, bet in zip(seats, bets):
+                try:
+                    self.requestBet(index, bet)
+                except BetError as e:
+                    await self.seats[index].send(f"ERR {e}")
+                    retry.append(index)
+            seats = retry
+
+    async def reportResult(self, index: int):
+        hands = self.players[index].hands
+        net = sum(hand.payoutDisplay - hand.active_bet for hand in hands)
+        await self.seats[index].send(f"RESULT {net} {self.players[index].wallet}")
+
+    def standUp(self):
+        for index, seat in enumerate(self.seats):
+            if seat is not None and (seat.leaving or not seat.connected):
+                seat.close()
+                self.seats[index] = None
+        if all(seat is None for seat in self.seats):
+            self.occupied.clear()
+
+
+class GameServer:
+    """
+    Hosts tables behind the line protocol on an asyncio server. Each JOIN takes the first
+    free seat, opening a new table (up to maxTables) when every seat is taken.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT, maxTables: int = 10_000,
+                 startingWallet: int = STARTING_WALLET, actionTimeout: float = ACTION_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.maxTables = maxTables
+        self.startingWallet = startingWallet
+        self.actionTimeout = actionTimeout
+        self.tables: List[ServerTable] = []
+        self.tasks: List[asyncio.Task] = []
+        self.server: Optional[asyncio.Server] = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port, backlog=4096)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def serveForever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        for task in self.tasks:
+            task.cancel()
+        for table in self.tables:
+            self.closeSeats(table)
+
+    @staticmethod
+    def closeSeats(table: ServerTable):
+        for seat in table.seats:
+            if seat is not None:
+                seat.close()
+
+    def tableStopped(self, table: ServerTable, task: asyncio.Task):
+        # A table only stops by being cancelled or crashing; either way nobody is playing at it
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Table %d stopped", table.tableId, exc_info=task.exception())
+        self.closeSeats(table)
+
+    def findSeat(self):
+        for table in self.tables:
+            if table.task.done():
+                continue
+            index = table.freeSeat()
+            if index is not None:
+                return table, index
+        if len(self.tables) >= self.maxTables:
+            return None, None
+        table = ServerTable(len(self.tables), self.startingWallet, self.actionTimeout)
+        self.tables.append(table)
+        table.task = asyncio.create_task(table.run())
+        table.task.add_done_callback(lambda task: self.tableStopped(table, task))
+        self.tasks.append(table.task)
+        return table, 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        seat = Seat(reader, writer)
+        line = await reader.readline()
+        if line.decode().strip().upper() != "JOIN":
+            await seat.send("ERR Expected JOIN")
+            seat.close()
+            return
+        table, index = self.findSeat()
+        if table is None:
+            await seat.send("ERR Server full")
+            seat.close()
+            return
+        await table.sit(index, seat)
+        # The table reads from here on; keep the connection until it stands the player up
+        await seat.closed.wait()
+
+    def seatsTaken(self) -> int:
+        return sum(seat is not None for table in self.tables for seat in table.seats)
+
+    def roundsPlayed(self) -> int:
+        return sum(table.roundsPlayed for table in self.tables)
+
+
+if __name__ == "__main__":
+    import sys
+
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    server = GameServer(port=port)
+
+    async def main():
+        await server.start()
+        print(f"Serving blackjack on {server.host}:{server.port}")
+        await server.serveForever()
+
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+from functools import lru_cache
+from typing import List, Tuple
+
+# NumPy is only needed for the batch functions; makePayouts settles a table round without it.
+
+# Hand outcomes, in increasing order of what they pay
+BUST = 0
+LOSS = 1
+PUSH = 2
+WIN = 3
+BLACKJACK = 4
+OUTCOME_NAMES = {BUST: "bust", LOSS: "loss", PUSH: "push", WIN: "win", BLACKJACK: "blackjack"}
+
+# Settlement keys: a standing total 0-21, or one of these for hands that never compare totals
+BUST_KEY = 22
+BLACKJACK_KEY = 23
+NUM_KEYS = 24
+
+
+def classify(dealerKey: int, playerKey: int) -> int:
+    """
+    The outcome of one hand, with makePayouts' precedence: the dealer does not peek, so a
+    dealer blackjack beats everything but a player blackjack, which pushes. Otherwise a
+    busted hand loses, a blackjack wins, and standing hands beat a busted dealer or compare.
+    """
+    if dealerKey == BLACKJACK_KEY:
+        return PUSH if playerKey == BLACKJACK_KEY else BUST if playerKey == BUST_KEY else LOSS
+    if playerKey == BUST_KEY:
+        return BUST
+    if playerKey == BLACKJACK_KEY:
+        return BLACKJACK
+    if dealerKey == BUST_KEY or playerKey > dealerKey:
+        return WIN
+    return PUSH if playerKey == dealerKey else LOSS
+
+
+# OUTCOME_TABLE[dealer key][player key], so settling a hand is two list lookups
+OUTCOME_TABLE: List[List[int]] = [[classify(dealer, player) for player in range(NUM_KEYS)] for dealer in range(NUM_KEYS)]
+
+
+def handKey(hand) -> int:
+    if hand.busted:
+        return BUST_KEY
+    if hand.hasBlackjack:
+        return BLACKJACK_KEY
+    return hand.value
+
+
+def payoutMultipliers(blackjackPayout: float) -> Tuple[float, ...]:
+    """Total return per unit bet for each outcome, the bet included."""
+    return 0, 0, 1, 2, blackjackPayout
+
+
+@lru_cache(maxsize=None)
+def payoutTable(blackjackPayout: float) -> Tuple[Tuple[float, ...], ...]:
+    """OUTCOME_TABLE with each outcome replaced by its return, so makePayouts needs one lookup per hand."""
+    multipliers = payoutMultipliers(blackjackPayout)
+    return tuple(tuple(multipliers[outcome] for outcome in row) for row in OUTCOME_TABLE)
+
+
+def batchKeys(total, busted, blackjack):
+    """Settlement keys for arrays of final hands, the vectorised form of handKey."""
+    import numpy as np
+    return np.where(busted, BUST_KEY, np.where(blackjack, BLACKJACK_KEY, total))
+
+
+def settleBatch(dealerKeys, playerKeys, bets, rules):
+    """
+    Vectorised settlement for arrays of hands, one dealer key per hand (or one to
+    broadcast). Returns the outcomes and the total return of each bet, bet included.
+    """
+    import numpy as np
+    outcomes = np.asarray(OUTCOME_TABLE, dtype=np.int8)[dealerKeys, playerKeys]
+    payouts = np.asarray(bets) * np.asarray(payoutMultipliers(rules.blackjack_payout), dtype=np.float64)[outcomes]
+    return outcomes, payouts
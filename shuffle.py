@@ -0,0 +1,142 @@
+import random
+from array import array
+from typing import List, MutableSequence
+
+# NumPy is only needed for NumpyBackend and the batch shuffle; plain deck shuffles work without it.
+
+MASK_64 = (1 << 64) - 1
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+
+class StdlibBackend:
+    """Random numbers from a random.Random instance (or the random module itself)."""
+
+    def __init__(self, rng=random):
+        self.rng = rng
+
+    def randbelow(self, n: int) -> int:
+        return self.rng.randrange(n)
+
+    def belowEach(self, bounds: range) -> List[int]:
+        randrange = self.rng.randrange
+        return [randrange(bound) for bound in bounds]
+
+    def belowArray(self, bound: int, size: int):
+        import numpy as np
+        randrange = self.rng.randrange
+        return np.fromiter((randrange(bound) for _ in range(size)), dtype=np.int64, count=size)
+
+
+class NumpyBackend:
+    """Random numbers from a numpy.random.Generator."""
+
+    def __init__(self, generator=None):
+        import numpy as np
+        self.generator = generator if generator is not None else np.random.default_rng()
+
+    def randbelow(self, n: int) -> int:
+        return int(self.generator.integers(n))
+
+    def belowEach(self, bounds: range) -> List[int]:
+        return self.generator.integers(0, bounds).tolist()
+
+    def belowArray(self, bound: int, size: int):
+        return self.generator.integers(0, bound, size=size)
+
+
+class CounterBackend:
+    """
+    Counter-based generator: the k-th output is the SplitMix64 finaliser applied to
+    seed + k * golden gamma. Any position of the stream can be computed directly, which
+    makes it cheap to vectorise and to split between workers by counter range.
+    """
+
+    def __init__(self, seed: int = 0, counter: int = 0):
+        self.seed = seed & MASK_64
+        self.counter = counter
+
+    @staticmethod
+    def mix(z: int) -> int:
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK_64
+        return z ^ (z >> 31)
+
+    def next64(self) -> int:
+        self.counter += 1
+        return CounterBackend.mix((self.seed + self.counter * GOLDEN_GAMMA) & MASK_64)
+
+    def randbelow(self, n: int) -> int:
+        # Modulo bias is below n / 2**64, far under anything a simulation can detect
+        return self.next64() % n
+
+    def belowEach(self, bounds: range) -> List[int]:
+        return [self.next64() % bound for bound in bounds]
+
+    def belowArray(self, bound: int, size: int):
+        import numpy as np
+        counters = np.arange(self.counter + 1, self.counter + size + 1, dtype=np.uint64)
+        self.counter += size
+        z = np.uint64(self.seed) + counters * np.uint64(GOLDEN_GAMMA)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+        return (z % np.uint64(bound)).astype(np.int64)
+
+
+def asBackend(rng):
+    """Wraps whatever RNG a deck was given in the matching backend."""
+    if rng is None:
+        return StdlibBackend()
+    if hasattr(rng, "belowEach"):
+        return rng
+    if isinstance(rng, random.Random) or rng is random:
+        return StdlibBackend(rng)
+    if type(rng).__name__ == "Generator":
+        return NumpyBackend(rng)
+    raise TypeError(f"Unsupported RNG for shuffling: {type(rng).__name__}")
+
+
+def fisherYates(items: MutableSequence, backend) -> MutableSequence:
+    """Shuffles items in place in O(n), drawing all swap targets in one backend call."""
+    if type(backend) is StdlibBackend:
+        rng = backend.rng
+        if rng is not random and type(rng) is not random.Random:
+            rng.shuffle(items)
+            return items
+        # random.shuffle's targets, from the same getrandbits calls in the same order, with its
+        # per-item _randbelow call inlined. Lists swap faster than arrays, so an array is
+        # shuffled as a list and copied back.
+        values = list(items)
+        getrandbits = rng.getrandbits
+        for i in range(len(values) - 1, 0, -1):
+            bound = i + 1
+            bits = bound.bit_length()
+            j = getrandbits(bits)
+            while j >= bound:
+                j = getrandbits(bits)
+            values[i], values[j] = values[j], values[i]
+        items[:] = array(items.typecode, values) if isinstance(items, array) else values
+        return items
+    n = len(items)
+    targets = backend.belowEach(range(n, 1, -1))
+    for i, j in zip(range(n - 1, 0, -1), targets):
+        items[i], items[j] = items[j], items[i]
+    return items
+
+
+def shuffleBatch(numShoes: int, numDecks: int = 1, backend=None):
+    """
+    Returns a (numShoes, 52 * numDecks) array where each row is an independently shuffled
+    order of card indices. Fisher-Yates runs on every row at once, one column per step.
+    """
+    import numpy as np
+    backend = asBackend(backend)
+    size = 52 * numDecks
+    shoes = np.tile(np.arange(size, dtype=np.int16), (numShoes, 1))
+    rows = np.arange(numShoes)
+    for i in range(size - 1, 0, -1):
+        j = backend.belowArray(i + 1, numShoes)
+        swap = shoes[rows, j]
+        shoes[rows, j] = shoes[:, i]
+        shoes[:, i] = swap
+    return shoes
@@ -0,0 +1,176 @@
+import math
+from statistics import NormalDist
+
+# NumPy is only needed for batches and stratified estimates; RunningStats.add works without it.
+
+# Strata: the dealer's upcard (ace 1 to ten) by the player's first two cards, hard 4-20 or soft 12-21
+NUM_CATEGORIES = 27
+NUM_STRATA = 10 * NUM_CATEGORIES
+
+
+def stratumIndex(upcard, first, second):
+    """
+    Stratum of a seat-round from the blackjack values (aces 1) of the dealer's upcard and
+    the player's first two cards. Works on ints and on NumPy arrays alike.
+    """
+    hard = first + second
+    soft = (first == 1) | (second == 1)
+    # Hard 4-20 are categories 0-16; soft hands (hard 2-11 with an ace) are 17-26
+    return (upcard - 1) * NUM_CATEGORIES + hard - 4 + 19 * soft
+
+
+def stratumWeights(numDecks: int):
+    """
+    Probability of each stratum when the three cards come from a full shoe of numDecks,
+    dealt without replacement. Any three cards of a shuffled shoe are distributed this
+    way, the ones a seat and the dealer's upcard get included.
+    """
+    import numpy as np
+    counts = [4 * numDecks] * 9 + [16 * numDecks]
+    total = 52 * numDecks
+    weights = np.zeros(NUM_STRATA)
+    for upcard in range(1, 11):
+        pUp = counts[upcard - 1] / total
+        for first in range(1, 11):
+            pFirst = (counts[first - 1] - (first == upcard)) / (total - 1)
+            for second in range(1, 11):
+                pSecond = (counts[second - 1] - (second == upcard) - (second == first)) / (total - 2)
+                weights[stratumIndex(upcard, first, second)] += pUp * pFirst * pSecond
+    return weights
+
+
+def upcardWeights():
+    """
+    Probability of each dealer upcard, ace (1) to ten: the strata of whole table rounds,
+    whose seats share the dealer's hand and so cannot be stratified one by one.
+    """
+    import numpy as np
+    return np.array([4] * 9 + [16], dtype=np.float64) / 52
+
+
+def zScore(confidence: float) -> float:
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+class RunningStats:
+    """
+    Running mean and variance by Welford's update, so they stay accurate however many
+    samples go in. Batches and other RunningStats are folded in with Chan's pairwise
+    combination, so partial results from workers merge exactly.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared deviations from the mean
+
+    def add(self, x: float, stratum: int = None):
+        # stratum is ignored, so every estimator takes the same calls
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def combine(self, count: int, mean: float, m2: float):
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def addBatch(self, values, strata=None):
+        import numpy as np
+        values = np.asarray(values, dtype=np.float64)
+        if len(values):
+            mean = float(values.mean())
+            self.combine(len(values), mean, float(np.square(values - mean).sum()))
+
+    def merge(self, other: "RunningStats"):
+        self.combine(other.count, other.mean, other.m2)
+        return self
+
+    def estimate(self) -> float:
+        return self.mean
+
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def standardError(self) -> float:
+        return math.sqrt(self.variance() / self.count) if self.count > 1 else math.inf
+
+    def halfWidth(self, confidence: float = 0.95) -> float:
+        return zScore(confidence) * self.standardError()
+
+    def __str__(self):
+        return f"{self.estimate():+.5f} ± {self.standardError():.5f} over {self.count:,} samples"
+
+
+class StratifiedStats:
+    """
+    Stratified mean: a Welford mean and variance per stratum, combined with the strata's
+    known probabilities. The spread between strata (a dealt 20 against a 6 versus a 16
+    against a ten) drops out of the standard error, leaving only the spread within them.
+    The estimate is undefined, with an infinite standard error, until every stratum with
+    any weight has two samples.
+    """
+
+    def __init__(self, weights):
+        import numpy as np
+        self.weights = np.asarray(weights, dtype=np.float64)
+        size = len(self.weights)
+        self.counts = np.zeros(size, dtype=np.int64)
+        self.means = np.zeros(size)
+        self.m2s = np.zeros(size)
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def add(self, x: float, stratum: int = None):
+        self.counts[stratum] += 1
+        delta = x - self.means[stratum]
+        self.means[stratum] += delta / self.counts[stratum]
+        self.m2s[stratum] += delta * (x - self.means[stratum])
+
+    def combine(self, counts, means, m2s):
+        import numpy as np
+        total = self.counts + counts
+        safe = np.maximum(total, 1)
+        delta = means - self.means
+        self.m2s += m2s + delta * delta * self.counts * counts / safe
+        self.means += delta * counts / safe
+        self.counts = total
+
+    def addBatch(self, values, strata):
+        import numpy as np
+        values = np.asarray(values, dtype=np.float64)
+        size = len(self.weights)
+        counts = np.bincount(strata, minlength=size)
+        sums = np.bincount(strata, weights=values, minlength=size)
+        means = sums / np.maximum(counts, 1)
+        m2s = np.bincount(strata, weights=np.square(values - means[strata]), minlength=size)
+        self.combine(counts, means, m2s)
+
+    def merge(self, other: "StratifiedStats"):
+        self.combine(other.counts, other.means, other.m2s)
+        return self
+
+    def estimate(self) -> float:
+        return float(self.weights @ self.means)
+
+    def standardError(self) -> float:
+        import numpy as np
+        needed = self.weights > 0
+        if np.any(self.counts[needed] < 2):
+            return math.inf
+        counts = self.counts[needed]
+        variances = self.m2s[needed] / (counts - 1)
+        return math.sqrt(float(np.sum(np.square(self.weights[needed]) * variances / counts)))
+
+    def halfWidth(self, confidence: float = 0.95) -> float:
+        return zScore(confidence) * self.standardError()
+
+    def __str__(self):
+        return f"{self.estimate():+.5f} ± {self.standardError():.5f} over {self.count:,} samples"
@@ -0,0 +1,182 @@
+from typing import Dict, List, Tuple
+
+from blackjacj import BlackjackHand, BlackjackRules, SouthPointRules, HIT, STAND, SPLIT, DOUBLE
+from deck import Card
+
+# Card values are indexed 1-10, aces as 1. Infinite-deck draw probabilities.
+CARD_VALUES = range(1, 11)
+CARD_PROBABILITIES = [0.0] + [1 / 13] * 9 + [4 / 13]
+
+# Dealer outcome slots: final totals 17-21, then bust, then a two-card blackjack
+DEALER_OUTCOMES = 7
+DEALER_BUST = 5
+DEALER_BLACKJACK = 6
+
+ACTION_NAMES = {HIT: "H", STAND: "S", DOUBLE: "D", SPLIT: "P"}
+
+
+def softTotal(hard: int, hasAce: bool) -> Tuple[int, bool]:
+    """Best total for a hand summed with aces as 1, and whether an ace is still counted as 11."""
+    if hasAce and hard + 10 <= 21:
+        return hard + 10, True
+    return hard, False
+
+
+def upcardValue(card: Card) -> int:
+    value = card.rank.score_value
+    return 1 if value == 11 else value
+
+
+class BasicStrategy:
+    """
+    Basic-strategy tables for one BlackjackRules, derived from infinite-deck expected
+    values rather than copied from a chart. Like the game, the dealer does not peek, so a
+    dealer blackjack takes doubled and split bets too; two-card 21s after a split are paid
+    as blackjacks. Resplits are budgeted per hand, a close approximation to max_splits.
+
+    Each table is indexed [canDouble][player total][dealer upcard], with upcards 1-10
+    (ace = 1), so a decision is a couple of list lookups.
+    """
+
+    def __init__(self, rules: BlackjackRules = SouthPointRules):
+        self.rules = rules
+        self.dealerDistributions = [None] + [self.dealerDistribution(up) for up in CARD_VALUES]
+
+        self.hard: List[List[List[int]]] = [[[HIT] * 11 for _ in range(22)] for _ in range(2)]
+        self.soft: List[List[List[int]]] = [[[HIT] * 11 for _ in range(22)] for _ in range(2)]
+        self.split: List[List[List[bool]]] = [[[False] * 11 for _ in range(11)] for _ in range(2)]
+
+        for up in CARD_VALUES:
+            self._bestMemo: Dict[Tuple[int, bool], float] = {}
+            self._splitMemo: Dict[Tuple[int, int], float] = {}
+            for canDouble in (False, True):
+                for total in range(2, 22):
+                    self.hard[canDouble][total][up] = self.bestAction(total, False, up, canDouble)[0]
+                for total in range(11, 22):
+                    self.soft[canDouble][total][up] = self.bestAction(total - 10, True, up, canDouble)[0]
+                for value in CARD_VALUES:
+                    if not rules.split_allowed or rules.max_splits < 1:
+                        continue
+                    hard, hasAce = 2 * value, value == 1
+                    splitEV = 2 * self.splitHandEV(value, rules.max_splits - 1, up)
+                    self.split[canDouble][value][up] = splitEV > self.bestAction(hard, hasAce, up, canDouble)[1]
+
+    def decide(self, hand: BlackjackHand, dealerUpcard: Card, canDouble: bool, canSplit: bool) -> int:
+        up = upcardValue(dealerUpcard)
+        if canSplit and self.split[canDouble][upcardValue(hand.cards[0])][up]:
+            return SPLIT
+        table = self.soft if hand.isSoft() else self.hard
+        return table[canDouble][hand.getValue()][up]
+
+    def batchDecide(self, total, soft, upcard, canDouble):
+        """Vectorised decide for BatchSimulator: numpy arrays in, an array of actions out."""
+        import numpy as np
+        if not hasattr(self, "_arrays"):
+            self._arrays = (np.array(self.hard), np.array(self.soft))
+        hard, softTable = self._arrays
+        doubling = canDouble.astype(np.intp)
+        return np.where(soft, softTable[doubling, total, upcard], hard[doubling, total, upcard])
+
+    # Expected values, all relative to the initial bet and the current dealer upcard
+
+    def dealerDistribution(self, up: int) -> List[float]:
+        memo = {}
+        h17 = self.rules.dealer_hits_on_soft_17
+
+        def walk(hard: int, hasAce: bool, numCards: int) -> List[float]:
+            key = (hard, hasAce, min(numCards, 3))
+            if key in memo:
+                return memo[key]
+            total, soft = softTotal(hard, hasAce)
+            outcome = [0.0] * DEALER_OUTCOMES
+            if numCards == 2 and total == 21:
+                outcome[DEALER_BLACKJACK] = 1.0
+            elif total > 21:
+                outcome[DEALER_BUST] = 1.0
+            elif total > 17 or (total == 17 and not (soft and h17)):
+                outcome[total - 17] = 1.0
+            else:
+                for card in CARD_VALUES:
+                    following = walk(hard + card, hasAce or card == 1, numCards + 1)
+                    for i in range(DEALER_OUTCOMES):
+                        outcome[i] += CARD_PROBABILITIES[card] * following[i]
+            memo[key] = outcome
+            return outcome
+
+        return walk(up, up == 1, 1)
+
+    def standEV(self, total: int, up: int) -> float:
+        if total > 21:
+            return -1.0
+        dealer = self.dealerDistributions[up]
+        ev = dealer[DEALER_BUST] - dealer[DEALER_BLACKJACK]
+        for dealerTotal in range(17, 22):
+            chance = dealer[dealerTotal - 17]
+            if total > dealerTotal:
+                ev += chance
+            elif total < dealerTotal:
+                ev -= chance
+        return ev
+
+    def blackjackEV(self, up: int) -> float:
+        # Pays blackjack_payout (bet included) unless the dealer also has one, which pushes
+        return (1 - self.dealerDistributions[up][DEALER_BLACKJACK]) * (self.rules.blackjack_payout - 1)
+
+    def bestEV(self, hard: int, hasAce: bool, up: int) -> float:
+        """EV of playing on with hit/stand only."""
+        if hard > 21:
+            return -1.0
+        key = (hard, hasAce)
+        if key not in self._bestMemo:
+            self._bestMemo[key] = max(self.standEV(softTotal(hard, hasAce)[0], up), self.hitEV(hard, hasAce, up))
+        return self._bestMemo[key]
+
+    def hitEV(self, hard: int, hasAce: bool, up: int) -> float:
+        return sum(CARD_PROBABILITIES[card] * self.bestEV(hard + card, hasAce or card == 1, up) for card in CARD_VALUES)
+
+    def doubleEV(self, hard: int, hasAce: bool, up: int) -> float:
+        return 2 * sum(CARD_PROBABILITIES[card] * self.standEV(softTotal(hard + card, hasAce or card == 1)[0], up)
+                       for card in CARD_VALUES)
+
+    def bestAction(self, hard: int, hasAce: bool, up: int, canDouble: bool) -> Tuple[int, float]:
+        choices = [(STAND, self.standEV(softTotal(hard, hasAce)[0], up)), (HIT, self.hitEV(hard, hasAce, up))]
+        if canDouble and self.rules.double_allowed:
+            choices.append((DOUBLE, self.doubleEV(hard, hasAce, up)))
+        return max(choices, key=lambda choice: choice[1])
+
+    def splitHandEV(self, value: int, splitsLeft: int, up: int) -> float:
+        """EV of one hand after a split, starting from a single card of the given value."""
+        key = (value, splitsLeft)
+        if key in self._splitMemo:
+            return self._splitMemo[key]
+        canDouble = self.rules.double_allowed and self.rules.double_after_split
+        ev = 0.0
+        for card in CARD_VALUES:
+            hard, hasAce = value + card, value == 1 or card == 1
+            if softTotal(hard, hasAce)[0] == 21:
+                outcome = self.blackjackEV(up)
+            else:
+                outcome = self.bestAction(hard, hasAce, up, canDouble)[1]
+            if card == value and splitsLeft > 0:
+                outcome = max(outcome, 2 * self.splitHandEV(value, splitsLeft - 1, up))
+            ev += CARD_PROBABILITIES[card] * outcome
+        self._splitMemo[key] = ev
+        return ev
+
+    def __str__(self) -> str:
+        header = "     " + " ".join(f"{up:>2}" for up in range(2, 11)) + "  A"
+        lines = ["Hard", header]
+        for total in range(5, 21):
+            lines.append(f"{total:>4} " + " ".join(f"{ACTION_NAMES[self.hard[True][total][up]]:>2}" for up in [*range(2, 11), 1]))
+        lines += ["Soft", header]
+        for total in range(13, 21):
+            lines.append(f"A,{total - 11:<2} " + " ".join(f"{ACTION_NAMES[self.soft[True][total][up]]:>2}" for up in [*range(2, 11), 1]))
+        lines += ["Pairs", header]
+        for value in [*range(2, 11), 1]:
+            name = "A" if value == 1 else value
+            lines.append(f"{name:>2},{name:<2}" + " ".join(f"{'P' if self.split[True][value][up] else '-':>2}" for up in [*range(2, 11), 1]))
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(BasicStrategy())
@@ -0,0 +1,227 @@
+import csv
+import itertools
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Sequence, TextIO, Tuple
+
+import numpy as np
+
+from blackjacj import BlackjackGame, BlackjackRules, NUM_PLAYERS, PENETRATION
+from replay import SeededShoes
+from settlement import handKey, settleBatch
+from simulator import Simulator, flatBetPolicy
+from strategy import BasicStrategy
+
+# Blackjack payouts by name, as the total return per unit bet (bet included)
+PAYOUTS = {"3:2": 2.5, "6:5": 2.2, "1:1": 2.0}
+DECK_COUNTS = (1, 2, 6, 8)
+MAX_SPLITS = (1, 2, 3)
+
+TABLE_COLUMNS = ["decks", "h17", "payout", "double", "das", "split", "max_splits", "rounds", "hands",
+                 "house_edge", "std_error", "seat_round_variance", "play_cell"]
+
+
+def ruleGrid(deckCounts: Sequence[int] = DECK_COUNTS, payouts: Sequence[float] = tuple(PAYOUTS.values()),
+             maxSplits: Sequence[int] = MAX_SPLITS) -> List[Tuple[int, BlackjackRules]]:
+    """
+    Every distinct (numDecks, rules) combination. Flags that cannot matter are pinned
+    rather than crossed: double after split needs both doubling and splitting, and
+    max_splits needs splitting.
+    """
+    grid = []
+    for numDecks, h17, payout, double, split in itertools.product(deckCounts, (False, True), payouts,
+                                                                  (False, True), (False, True)):
+        for splits in (maxSplits if split else (0,)):
+            for das in ((False, True) if double and split else (False,)):
+                grid.append((numDecks, BlackjackRules(dealer_hits_on_soft_17=h17, blackjack_payout=payout,
+                                                      double_allowed=double, double_after_split=das,
+                                                      split_allowed=split, max_splits=splits)))
+    return grid
+
+
+def playKey(numDecks: int, rules: BlackjackRules, strategy: BasicStrategy) -> tuple:
+    """
+    Cells with the same key play every round identically and differ only in settlement,
+    so one simulation serves them all. Strategy tables are part of the key because basic
+    strategy can depend on the payout (split 21s are paid as blackjacks).
+    """
+    return (numDecks, rules.dealer_hits_on_soft_17, rules.double_allowed, rules.double_after_split,
+            rules.split_allowed, rules.max_splits, repr((strategy.hard, strategy.soft, strategy.split)))
+
+
+class SettlementRecorder:
+    """
+    History hooks (see BlackjackGame.history) that keep what settlement needs and nothing
+    else: each hand's dealer and player keys, its bet in minimum bets, the seat-round it
+    belongs to and each seat-round's round. Payouts are left to settleBatch, so they can
+    be redone for any payout.
+    """
+
+    def __init__(self):
+        self.dealerKeys = array('B')
+        self.playerKeys = array('B')
+        self.bets = array('d')
+        self.samples = array('q')
+        self.sampleRounds = array('q')
+        self.numSamples = 0
+        self.numRounds = 0
+
+    def attach(self, game: BlackjackGame):
+        game.history = self
+
+    def startRound(self, shoe_position: int):
+        pass
+
+    def action(self, index: int, decision: int):
+        pass
+
+    def endRound(self, game: BlackjackGame):
+        dealerKey = handKey(game.dealer_hand)
+        unit = game.min_bet
+        for player in game.players:
+            if not player.hands[0].active_bet:
+                continue
+            for hand in player.hands:
+                self.dealerKeys.append(dealerKey)
+                self.playerKeys.append(handKey(hand))
+                self.bets.append(hand.active_bet / unit)
+                self.samples.append(self.numSamples)
+            self.sampleRounds.append(self.numRounds)
+            self.numSamples += 1
+        self.numRounds += 1
+
+    def settle(self, rules: BlackjackRules) -> np.ndarray:
+        """Net units won by every seat-round under rules' payouts."""
+        bets = np.frombuffer(self.bets, dtype=np.float64)
+        _, payouts = settleBatch(np.frombuffer(self.dealerKeys, dtype=np.uint8),
+                                 np.frombuffer(self.playerKeys, dtype=np.uint8), bets, rules)
+        return np.bincount(np.frombuffer(self.samples, dtype=np.int64), weights=payouts - bets,
+                           minlength=self.numSamples)
+
+
+class CellResult:
+    """
+    House edge of one (numDecks, rules) cell, with the variance of a seat-round's net: a
+    seat's hands together, splits and doubles included. The standard error treats each
+    round as one sample, since a table's seats share the dealer's hand.
+    """
+
+    def __init__(self, numDecks: int, rules: BlackjackRules, rounds: int, hands: int, net: np.ndarray,
+                 sampleRounds: np.ndarray, playCell: int):
+        self.numDecks = numDecks
+        self.rules = rules
+        self.rounds = rounds
+        self.hands = hands
+        self.samples = len(net)
+        self.mean = float(net.mean())
+        self.seatRoundVariance = float(net.var(ddof=1))
+        # Ratio estimator over rounds: each round's net less what the mean predicts for its seats
+        roundNet = np.bincount(sampleRounds, weights=net)
+        seats = np.bincount(sampleRounds)
+        played = seats > 0
+        residuals = roundNet[played] - self.mean * seats[played]
+        numRounds = len(residuals)
+        self.standardError = float(np.sqrt(np.square(residuals).sum() / (numRounds * (numRounds - 1)))
+                                   / seats[played].mean())
+        self.playCell = playCell
+
+    @property
+    def houseEdge(self) -> float:
+        return -self.mean
+
+    def row(self) -> list:
+        rules = self.rules
+        payout = next((name for name, value in PAYOUTS.items() if value == rules.blackjack_payout),
+                      f"{rules.blackjack_payout - 1:g}:1")
+        return [self.numDecks, int(rules.dealer_hits_on_soft_17), payout, int(rules.double_allowed),
+                int(rules.double_after_split), int(rules.split_allowed), rules.max_splits, self.rounds, self.hands,
+                f"{self.houseEdge:.5f}", f"{self.standardError:.5f}", f"{self.seatRoundVariance:.4f}", self.playCell]
+
+
+def playCell(numDecks: int, cells: List[BlackjackRules], rounds: int, seed: int, penetration: float,
+             playCellIndex: int) -> List[CellResult]:
+    """
+    Plays rounds once with cells[0]'s rules and settles them under each cell's rules.
+    Every play cell deals the same seeded shoes, so differences between rule sets are
+    common-random-number comparisons.
+    """
+    rules = cells[0]
+    simulator = Simulator(rules=rules, playerPolicy=BasicStrategy(rules).decide, betPolicy=flatBetPolicy,
+                          numDecks=numDecks, penetration=penetration, shoes=SeededShoes(seed))
+    recorder = SettlementRecorder()
+    recorder.attach(simulator)
+    simulator.run(rounds)
+    hands = len(recorder.bets)
+    sampleRounds = np.frombuffer(recorder.sampleRounds, dtype=np.int64)
+    return [CellResult(numDecks, cell, rounds, hands, recorder.settle(cell), sampleRounds, playCellIndex)
+            for cell in cells]
+
+
+def runSweep(
+    rounds: int,
+    seed: int = 0,
+    grid: List[Tuple[int, BlackjackRules]] = None,
+    workers: int = None,
+    penetration: float = PENETRATION
+) -> List[CellResult]:
+    """
+    Evaluates every cell of grid (ruleGrid() by default) over rounds rounds of a full
+    table playing basic strategy. Cells that differ only in settlement share one play
+    cell; play cells run in parallel on a process pool. Results come back in grid order.
+    """
+    grid = grid if grid is not None else ruleGrid()
+    groups: Dict[tuple, List[int]] = {}
+    strategies: Dict[tuple, BasicStrategy] = {}
+    for index, (numDecks, rules) in enumerate(grid):
+        # Basic strategy only depends on the rules, not the deck count
+        ruleKey = (rules.dealer_hits_on_soft_17, rules.blackjack_payout, rules.double_allowed,
+                   rules.double_after_split, rules.split_allowed, rules.max_splits)
+        if ruleKey not in strategies:
+            strategies[ruleKey] = BasicStrategy(rules)
+        groups.setdefault(playKey(numDecks, rules, strategies[ruleKey]), []).append(index)
+
+    jobs = list(groups.values())
+    args = ([grid[members[0]][0] for members in jobs], [[grid[index][1] for index in members] for members in jobs],
+            [rounds] * len(jobs), [seed] * len(jobs), [penetration] * len(jobs), range(len(jobs)))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        played = map(playCell, *args)
+        results = [result for cellResults in played for result in cellResults]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = [result for cellResults in pool.map(playCell, *args) for result in cellResults]
+
+    ordered = [None] * len(grid)
+    for index, result in zip((index for members in jobs for index in members), results):
+        ordered[index] = result
+    return ordered
+
+
+def writeTable(results: List[CellResult], file: TextIO):
+    writer = csv.writer(file)
+    writer.writerow(TABLE_COLUMNS)
+    for result in results:
+        writer.writerow(result.row())
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    # sweep.py [rounds per cell] [results.csv]
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    path = sys.argv[2] if len(sys.argv) > 2 else "sweep.csv"
+    grid = ruleGrid()
+    start = time.perf_counter()
+    results = runSweep(rounds, grid=grid)
+    elapsed = time.perf_counter() - start
+    with open(path, "w", newline="") as file:
+        writeTable(results, file)
+    playCells = len({result.playCell for result in results})
+    print(f"{len(results)} cells from {playCells} play cells, {rounds * NUM_PLAYERS:,} seat-rounds each, "
+          f"in {elapsed:.1f}s on {os.cpu_count()} cores -> {path}")
+    best = min(results, key=lambda result: result.houseEdge)
+    worst = max(results, key=lambda result: result.houseEdge)
+    for label, result in (("Best", best), ("Worst", worst)):
+        print(f"{label}: " + ", ".join(f"{name}={value}" for name, value in zip(TABLE_COLUMNS, result.row())))
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from blackjacj import BlackjackHand
+from deck import Card, Ranks, Suits
+
+CARDS = [Card(rank.value, suit.value) for rank in Ranks if rank != Ranks.LOW_ACE for suit in Suits]
+
+
+def recompute(cards):
+    """The hand's total and whether it is soft, counted from scratch."""
+    value = sum(card.rank.score_value for card in cards)
+    aces = sum(card.rank is Ranks.ACE.value for card in cards)
+    while value > 21 and aces:
+        value -= 10
+        aces -= 1
+    return value, aces > 0
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_incremental_totals_match_a_full_recompute(seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        hand = BlackjackHand(0)
+        cards = [rng.choice(CARDS) for _ in range(rng.randint(1, 8))]
+        for count, card in enumerate(cards, 1):
+            hand.append(card)
+            value, soft = recompute(cards[:count])
+            assert hand.getValue() == value
+            assert hand.isSoft() == soft
+            assert hand.busted == (value > 21)
+            assert hand.canSplit == (count == 2 and cards[0].rank is cards[1].rank)
+        assert hand.hasBlackjack == (len(cards) >= 2 and recompute(cards[:2])[0] == 21)
+
+
+def test_reset_clears_totals():
+    hand = BlackjackHand(0)
+    for name in ("A♠", "K♥", "5♦"):
+        hand.append(Card.from_string(name))
+    hand.reset()
+    hand.append(Card.from_string("A♣"))
+    assert (hand.getValue(), hand.isSoft(), hand.busted, hand.hasBlackjack) == (11, True, False, False)
+
+
+def test_aces_drop_to_one_only_as_needed():
+    hand = BlackjackHand(0)
+    values = []
+    for name in ("A♠", "A♥", "9♦", "A♣", "K♠"):
+        hand.append(Card.from_string(name))
+        values.append((hand.getValue(), hand.isSoft()))
+    assert values == [(11, True), (12, True), (21, True), (12, False), (22, False)]
+    assert hand.busted
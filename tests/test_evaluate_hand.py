@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+from bench_score import legacyEvaluate, randomHands, sameResult
+from deck import Card, HandTypes, Ranks, Suits, evaluateHand
+
+
+def describe(result) -> str:
+    handType, cards = result
+    return f"{handType} {[str(card) for card in cards]}"
+
+
+def crowdedHands(count: int, size: int, rng: random.Random) -> list:
+    """Hands from a few neighbouring ranks in two suits of a two-deck shoe, so straights, flushes and sets are common."""
+    ranks = [rank for rank in Ranks if rank != Ranks.LOW_ACE]
+    hands = []
+    for _ in range(count):
+        start = rng.randrange(len(ranks) - 5)
+        suits = rng.sample(list(Suits), 2)
+        pool = [Card(rank.value, suit.value) for _ in range(2) for rank in ranks[start:start + 6] for suit in suits]
+        hands.append(rng.sample(pool, size))
+    return hands
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 4, 5, 6, 7, 8])
+@pytest.mark.parametrize("numDecks", [1, 2])
+def test_matches_the_findHand_walk_on_random_hands(size, numDecks):
+    for hand in randomHands(2_000, size, numDecks, random.Random(size * 10 + numDecks)):
+        expected, actual = legacyEvaluate(hand), evaluateHand(hand)
+        assert sameResult(expected, actual), f"{[str(card) for card in hand]}: {describe(expected)} != {describe(actual)}"
+
+
+def test_matches_the_findHand_walk_on_crowded_hands():
+    seen = set()
+    for size in (5, 6, 7, 8):
+        for hand in crowdedHands(2_000, size, random.Random(size)):
+            expected, actual = legacyEvaluate(hand), evaluateHand(hand)
+            assert sameResult(expected, actual), f"{[str(card) for card in hand]}: {describe(expected)} != {describe(actual)}"
+            seen.add(str(actual[0]))
+    # Every hand type should have come up, so none goes unchecked
+    assert seen == {str(handType.value) for handType in HandTypes}
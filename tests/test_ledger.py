@@ -0,0 +1,71 @@
+import io
+import random
+
+import pytest
+
+from ledger import BANK_WALLET_ID, Ledger, TRANSFER_RECORD
+
+NUM_PLAYERS = 5
+
+
+def playRandomly(ledger, seed, steps=300):
+    """Moves chips around at random with every kind of transfer; returns balances after each call."""
+    rng = random.Random(seed)
+    wallets = list(range(BANK_WALLET_ID, NUM_PLAYERS))
+    ledger.deposit(1_000_000, BANK_WALLET_ID)
+    for player in range(NUM_PLAYERS):
+        ledger.deposit(1_000, player)
+    snapshots = [(len(ledger.journal), list(ledger.balances))] if ledger.journal is not None else []
+    for _ in range(steps):
+        kind = rng.randrange(4)
+        amounts = [rng.randint(1, 50) for _ in range(NUM_PLAYERS)]
+        players = rng.sample(range(NUM_PLAYERS), rng.randint(1, NUM_PLAYERS))
+        try:
+            if kind == 0:
+                ledger.transfer(amounts[0], rng.choice(wallets), rng.choice(wallets))
+            elif kind == 1:
+                ledger.transferBatch(amounts[:len(players)], players, [rng.choice(wallets) for _ in players])
+            elif kind == 2:
+                ledger.payMany(amounts[:len(players)], BANK_WALLET_ID, players)
+            else:
+                ledger.collectMany(amounts[:len(players)], players, BANK_WALLET_ID)
+        except ValueError:
+            pass  # Refused transfers must leave no trace
+        if ledger.journal is not None:
+            snapshots.append((len(ledger.journal), list(ledger.balances)))
+    return snapshots
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_replay_rebuilds_balances(seed):
+    ledger = Ledger(NUM_PLAYERS)
+    playRandomly(ledger, seed)
+    assert list(Ledger.replay(bytes(ledger.journal), NUM_PLAYERS).balances) == list(ledger.balances)
+
+
+def test_replay_up_to_a_record_rebuilds_earlier_balances():
+    ledger = Ledger(NUM_PLAYERS)
+    snapshots = playRandomly(ledger, 1)
+    journal = bytes(ledger.journal)
+    for length, balances in snapshots:
+        upTo = length // TRANSFER_RECORD.size
+        assert list(Ledger.replay(journal, NUM_PLAYERS, upTo=upTo).balances) == balances
+
+
+def test_logged_journal_matches_the_in_memory_one():
+    inMemory = Ledger(NUM_PLAYERS)
+    playRandomly(inMemory, 2)
+    log = io.BytesIO()
+    logged = Ledger(NUM_PLAYERS, log=log)
+    playRandomly(logged, 2)
+    assert log.getvalue() == bytes(inMemory.journal)
+    assert list(Ledger.replay(log.getvalue(), NUM_PLAYERS).balances) == list(logged.balances)
+
+
+def test_refused_batch_moves_nothing():
+    ledger = Ledger(NUM_PLAYERS)
+    ledger.deposit(10, 0)
+    with pytest.raises(ValueError):
+        ledger.transferBatch([6, 6], [0, 0], [1, 2])
+    assert list(ledger.balances) == [0, 10, 0, 0, 0, 0]
+    assert len(ledger.journal) == TRANSFER_RECORD.size
@@ -0,0 +1,25 @@
+import pytest
+
+from montecarlo import ENGINE_BATCH, ENGINE_SIMULATOR, runMonteCarlo
+
+
+@pytest.mark.parametrize("engine, rounds, chunkRounds", [
+    (ENGINE_BATCH, 20_000, 3_000),
+    (ENGINE_SIMULATOR, 600, 150),
+])
+def test_seed_gives_same_result_for_any_worker_count(engine, rounds, chunkRounds):
+    results = [vars(runMonteCarlo(rounds, seed=7, engine=engine, workers=workers, chunkRounds=chunkRounds))
+               for workers in (1, 2, 3)]
+    assert results[0] == results[1] == results[2]
+    assert results[0]["rounds"] == rounds
+
+
+def test_different_seeds_give_different_results():
+    first = runMonteCarlo(600, seed=1, engine=ENGINE_SIMULATOR, workers=1, chunkRounds=150)
+    second = runMonteCarlo(600, seed=2, engine=ENGINE_SIMULATOR, workers=1, chunkRounds=150)
+    assert first.net_units != second.net_units
+
+
+def test_chunk_sizes_cover_uneven_runs():
+    result = runMonteCarlo(1_001, seed=3, engine=ENGINE_SIMULATOR, workers=1, chunkRounds=250)
+    assert result.rounds == 1_001
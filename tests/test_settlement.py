@@ -0,0 +1,84 @@
+import random
+
+import numpy as np
+import pytest
+
+from blackjacj import BlackjackHand, BlackjackRules, NUM_PLAYERS
+from deck import Card, Ranks, Suits
+from ledger import BANK_WALLET_ID
+from settlement import OUTCOME_TABLE, handKey, payoutMultipliers, payoutTable, settleBatch
+from simulator import Simulator
+
+CARDS = [Card(rank.value, suit.value) for rank in Ranks if rank != Ranks.LOW_ACE for suit in Suits]
+BLACKJACK_PAYOUTS = [2.5, 2.2, 2.0]
+
+
+def legacyPayout(dealer: BlackjackHand, hand: BlackjackHand, blackjackPayout: float) -> int:
+    """What the original makePayouts paid a hand, branch for branch; 0 where it paid nothing."""
+    if dealer.hasBlackjack:
+        return int(hand.active_bet) if hand.hasBlackjack else 0
+    if hand.busted:
+        return 0
+    if hand.hasBlackjack:
+        return int(hand.active_bet * blackjackPayout)
+    if dealer.busted or hand.getValue() > dealer.getValue():
+        return int(hand.active_bet * 2)
+    if hand.getValue() == dealer.getValue():
+        return int(hand.active_bet)
+    return 0
+
+
+def randomHand(rng: random.Random, bet: int = 0) -> BlackjackHand:
+    """A hand as play leaves it: two cards, then more until it stands, reaches 21 or busts."""
+    hand = BlackjackHand(0)
+    hand.active_bet = bet
+    hand.append(rng.choice(CARDS))
+    hand.append(rng.choice(CARDS))
+    while hand.getValue() < 21 and rng.random() < 0.5:
+        hand.append(rng.choice(CARDS))
+    return hand
+
+
+@pytest.mark.parametrize("blackjackPayout", BLACKJACK_PAYOUTS)
+def test_payout_table_matches_makePayouts_branches(blackjackPayout):
+    rng = random.Random(blackjackPayout)
+    table = payoutTable(blackjackPayout)
+    for _ in range(5_000):
+        dealer = randomHand(rng)
+        hand = randomHand(rng, bet=rng.randint(1, 500))
+        expected = legacyPayout(dealer, hand, blackjackPayout)
+        assert int(hand.active_bet * table[handKey(dealer)][handKey(hand)]) == expected
+
+
+@pytest.mark.parametrize("blackjackPayout", BLACKJACK_PAYOUTS)
+def test_settle_batch_matches_table_lookups(blackjackPayout):
+    rng = np.random.default_rng(3)
+    dealerKeys = rng.integers(0, len(OUTCOME_TABLE), 10_000)
+    playerKeys = rng.integers(0, len(OUTCOME_TABLE), 10_000)
+    bets = rng.integers(1, 500, 10_000)
+
+    outcomes, payouts = settleBatch(dealerKeys, playerKeys, bets, BlackjackRules(blackjack_payout=blackjackPayout))
+
+    table = payoutTable(blackjackPayout)
+    multipliers = payoutMultipliers(blackjackPayout)
+    for dealer, player, bet, outcome, payout in zip(dealerKeys, playerKeys, bets, outcomes, payouts):
+        assert outcome == OUTCOME_TABLE[dealer][player]
+        assert payout == bet * multipliers[outcome] == bet * table[dealer][player]
+
+
+def test_game_makePayouts_pays_what_the_original_did():
+    rng = random.Random(9)
+    game = Simulator(rng=random.Random(0))
+    for _ in range(500):
+        game.dealer_hand = randomHand(rng)
+        expected = [0] * NUM_PLAYERS
+        for i, player in enumerate(game.players):
+            player.hands = [randomHand(rng, bet=rng.randint(1, 100)) for _ in range(rng.randint(1, 3))]
+            expected[i] = sum(legacyPayout(game.dealer_hand, hand, game.rules.blackjack_payout) for hand in player.hands)
+        before = list(game.ledger.balances)
+
+        game.makePayouts()
+
+        paid = [after - start for after, start in zip(game.ledger.balances, before)]
+        assert paid[1:] == expected
+        assert paid[BANK_WALLET_ID + 1] == -sum(expected)
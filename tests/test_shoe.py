@@ -0,0 +1,107 @@
+import random
+
+import pytest
+
+from deck import Shoe
+from simulator import Simulator
+
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+
+    def shuffled(self):
+        self.events.append("shuffled")
+
+    def cardDrawn(self, card):
+        self.events.append(card)
+
+    def cardRevealed(self, card):
+        pass
+
+
+def newShoe(numDecks=1, penetration=1.0):
+    shoe = Shoe(numDecks=numDecks, penetration=penetration, rng=random.Random(5))
+    shoe.shuffle()
+    return shoe
+
+
+def test_reshuffle_keeps_cards_on_the_table():
+    shoe = newShoe()
+    for _ in range(10):
+        shoe.draw()
+    shoe.endRound()
+    onTable = [shoe.draw() for _ in range(4)]
+
+    shoe.reshuffleDiscards()
+
+    assert shoe.position == 4
+    assert [shoe.base_cards[index] for index in shoe.order[:4]] == onTable
+    assert sorted(shoe.order) == list(range(52))
+    dealt = {id(card) for card in onTable}
+    assert not any(id(shoe.draw()) in dealt for _ in range(48))
+
+
+def test_reshuffle_replays_cards_on_the_table_to_listeners():
+    shoe = newShoe()
+    shoe.draw()
+    shoe.endRound()
+    onTable = [shoe.draw(), shoe.draw()]
+    recorder = Recorder()
+    shoe.listeners.append(recorder)
+
+    shoe.reshuffleDiscards()
+
+    assert recorder.events == ["shuffled"] + onTable
+
+
+def test_ended_rounds_are_discards():
+    shoe = newShoe()
+    for _ in range(5):
+        shoe.draw()
+    shoe.endRound()
+
+    shoe.reshuffleDiscards()
+
+    assert shoe.position == 0
+    assert sorted(shoe.order) == list(range(52))
+
+
+def test_drawing_past_the_end_deals_from_the_discards():
+    shoe = newShoe()
+    for _ in range(50):
+        shoe.draw()
+    shoe.endRound()
+    onTable = [shoe.draw() for _ in range(2)]
+
+    more = [shoe.draw() for _ in range(50)]
+
+    assert shoe.shoe_index == 1
+    assert len({id(card) for card in onTable + more}) == 52
+
+
+def test_reshuffle_with_every_card_on_the_table_fails():
+    shoe = newShoe()
+    for _ in range(52):
+        shoe.draw()
+    with pytest.raises(ValueError):
+        shoe.reshuffleDiscards()
+
+
+def test_simulator_never_deals_a_card_twice_in_a_round():
+    # One deck dealt to the last card runs out mid-round again and again
+    simulator = Simulator(numDecks=1, penetration=1.0, rng=random.Random(11))
+    shoe = simulator.deck
+    endRound = shoe.endRound
+    rounds = []
+
+    def checkedEndRound():
+        rounds.append(shoe.order[shoe.round_start:shoe.position])
+        endRound()
+
+    shoe.endRound = checkedEndRound
+    simulator.run(300)
+
+    assert shoe.shoe_index > 20
+    assert len(rounds) == 300
+    assert all(len(set(cards)) == len(cards) for cards in rounds)